@@ -1,14 +1,104 @@
 """Define the compatibile() function, which calculates the compatibility
 between two sets of types, given complete pairwise type intersection
-information from compatibility_matrix.
+information from compatibility_matrix.  The matrix is read from its compiled,
+memory-mapped form (see compatibility_file.py).
+
+Sets of types are bitsets of type IDs (see type_ids.py).
 """
 
 from __future__ import division
 
-from compatibility_matrix import compatibility
+from collections import namedtuple
+
+try: import numpy
+except ImportError: numpy = None  # Only needed by compatible_many().
+
+import compatibility_file
+
+matrix = compatibility_file.load()
+
+# How many results of compatible(), how many estimate_instances() of a set of
+# types, and how many pairwise counts from the matrix to remember.  See
+# cache_info() for how well these are doing.
+FIT_CACHE_SIZE = 100000
+ESTIMATE_CACHE_SIZE = 20000
+COUNT_CACHE_SIZE = 100000
+
+# compatible_many() only bothers with numpy for at least this many new pairs.
+NUMPY_BATCH_SIZE = 64
 
 DEBUG = False
 
+CacheInfo = namedtuple('CacheInfo', 'hits misses maxsize currsize')
+
+# =============================================================================
+class LRUCache:
+    """A mapping of at most maxsize entries, which forgets the least recently
+    used entries to make room for new ones.  Counts hits and misses.
+
+    Entries are evicted a tenth at a time, so a lookup only has to note when
+    the entry was used, rather than keep the entries in order of use.
+    """
+# =============================================================================
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = {}  # Key -> [value, time of last use]
+        self.time = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Return the value for key, or default if it isn't cached."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.time += 1
+        entry[1] = self.time
+        return entry[0]
+
+    def put(self, key, value):
+        self.time += 1
+        self.entries[key] = [value, self.time]
+        if len(self.entries) > self.maxsize:
+            by_use = sorted(self.entries, key=lambda x: self.entries[x][1])
+            for key in by_use[:len(by_use) - self.maxsize * 9 // 10]:
+                del self.entries[key]
+
+    def __contains__(self, key):
+        """Whether key is cached, without counting as a use, hit or miss."""
+        return key in self.entries
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                         len(self.entries))
+
+# compatible() results, keyed on the (unordered) pair of sets of types.
+fits = LRUCache(FIT_CACHE_SIZE)
+
+# estimate_instances() results, keyed on sets of types.
+estimates = LRUCache(ESTIMATE_CACHE_SIZE)
+
+# Pairwise intersection counts read from the matrix, by pair of type IDs.
+# Interpretation asks for the same few pairs over and over, so this saves a
+# binary search per lookup.  (None marks pairs missing from the matrix.)
+counts = LRUCache(COUNT_CACHE_SIZE)
+
+def cache_info():
+    """Return CacheInfo for the compatible(), estimate_instances() and
+    pairwise count caches, as a dict.  Useful for sizing the caches of a
+    long-running process.
+    """
+    return {'compatible': fits.info(), 'estimate_instances': estimates.info(),
+            'counts': counts.info()}
+
 # =============================================================================
 def compatible(types1, types2):
     """
@@ -29,28 +119,143 @@ def compatible(types1, types2):
     denominator in the equation above is large.  For example, use:
     
     (top / bottom) ** (1 / bottom ** 0.2)
+
+    Results are cached (see fits), since interpretation asks about the same
+    sets of types over and over.
     """
 # =============================================================================
 
     if DEBUG: print("Compatible(%s, %s)" % (types1, types2))
 
-    def estimate_instances(types):
-        running_min = 1000000000 # billion
-        for t1 in types:
-            if t1 not in compatibility: return 0
-            for t2 in types:
-                if t2 not in compatibility[t1]: return 0
-                running_min = min(running_min, compatibility[t1][t2])
-        return running_min
-                
-    top = estimate_instances(types1 | types2)
+    key = (min(types1, types2), max(types1, types2))  # The fit is symmetric.
+    fit = fits.get(key)
+    if fit is None:
+        fit = fit_between(types1, types2)
+        fits.put(key, fit)
+    return fit
+
+def fit_between(types1, types2):
+    """Work out compatible(types1, types2), without the cache."""
     bottom = min(estimate_instances(types1), estimate_instances(types2))
-    if bottom == 0: return 0
+    if bottom == 0: fit = 0
+    else:
+        # The smallest intersection within the union is the smallest within
+        # either set, or between them, so only the cross pairs are new work.
+        union = types1 | types2
+        top = estimates.get(union)
+        if top is None:
+            top = min(bottom, estimate_between(ids_in(types1),
+                                               ids_in(types2)))
+            estimates.put(union, top)
 
-    if DEBUG: print("= %d / %d" % (top, bottom))
+        if DEBUG: print("= %d / %d" % (top, bottom))
+
+        # The "** (1 / bottom ** N)" biases toward large denominators.
+        fit = (top / bottom) ** (1 / bottom ** 0.2)
+    return fit
+
+# =============================================================================
+def compatible_many(pairs):
+    """Return compatible(types1, types2) for each (types1, types2) in pairs.
+    With numpy, the pairs that aren't cached are worked out together: every
+    count they need is looked up in one pass over the matrix, and the fits are
+    computed as arrays.  Without numpy, this is just a loop.
+    """
+# =============================================================================
+
+    results = [None] * len(pairs)
+    missing = {}  # Uncached key -> indexes into pairs.
+    for (index, (types1, types2)) in enumerate(pairs):
+        key = (min(types1, types2), max(types1, types2))
+        fit = fits.get(key)
+        if fit is None: missing.setdefault(key, []).append(index)
+        else: results[index] = fit
+
+    keys = list(missing)
+    if numpy is None or len(keys) < NUMPY_BATCH_SIZE:
+        new_fits = [fit_between(types1, types2) for (types1, types2) in keys]
+    else:
+        estimate_many(set([types1 for (types1, types2) in keys] +
+                          [types2 for (types1, types2) in keys] +
+                          [types1 | types2 for (types1, types2) in keys]))
+        def estimates_of(sets):
+            return numpy.array([estimate_instances(types) for types in sets],
+                               dtype=float)
+        top = estimates_of([types1 | types2 for (types1, types2) in keys])
+        bottom = numpy.minimum(
+                estimates_of([types1 for (types1, types2) in keys]),
+                estimates_of([types2 for (types1, types2) in keys]))
+        # Same formula as fit_between(), where bottom isn't 0.
+        safe_bottom = numpy.where(bottom == 0, 1, bottom)
+        new_fits = numpy.where(bottom == 0, 0, (top / safe_bottom) **
+                               (1 / safe_bottom ** 0.2)).tolist()
+
+    for (key, fit) in zip(keys, new_fits):
+        fits.put(key, fit)
+        for index in missing[key]: results[index] = fit
+    return results
+
+def estimate_many(sets):
+    """Make sure estimate_instances() has cached every one of a collection of
+    sets of types, looking up the counts for all the uncached ones in one batch
+    (with numpy).
+    """
+    num_types = len(matrix)
+    sets = [types for types in sets if types and types not in estimates]
+    keys = []
+    starts = []
+    for types in sets:
+        starts.append(len(keys))
+        ids = ids_in(types)
+        for (index, t1) in enumerate(ids):
+            for t2 in ids[index:]:
+                # ids are in order, so t1 <= t2.  Types that aren't in the
+                # matrix get a key that can't be found.
+                if t2 < num_types: keys.append(t1 * num_types + t2)
+                else: keys.append(-1)
+    if not sets: return
+    pair_counts = matrix.pair_counts(keys)
+    # A missing pair (-1) means no instances, like a count of 0.
+    mins = numpy.minimum.reduceat(numpy.maximum(pair_counts, 0), starts)
+    for (types, estimate) in zip(sets, mins.tolist()):
+        estimates.put(types, estimate)
+
+def estimate_instances(types):
+    """Estimate how many objects have all of a set of types, as the smallest
+    pairwise intersection.  Returns 0 if any pair is missing.
+    """
+    estimate = estimates.get(types)
+    if estimate is None:
+        ids = ids_in(types)
+        estimate = estimate_between(ids, ids)
+        estimates.put(types, estimate)
+    return estimate
+
+def estimate_between(ids1, ids2):
+    """Return the smallest intersection of a type in ids1 with a type in ids2
+    (lists of type IDs), or 0 if any such pair is missing.
+    """
+    running_min = 1000000000 # billion
+    num_types = len(matrix)
+    for t1 in ids1:
+        for t2 in ids2:
+            count = counts.get((t1, t2), -1)
+            if count == -1:
+                if t1 >= num_types or t2 >= num_types: count = None
+                else: count = matrix.count_by_id(t1, t2)
+                counts.put((t1, t2), count)
+            if count is None: return 0
+            running_min = min(running_min, count)
+    return running_min
 
-    # The "** (1 / bottom ** N)" biases toward large denominators.
-    return (top / bottom) ** (1 / bottom ** 0.2)
+def ids_in(bits):
+    """Return the IDs of the types in a bitset, in order."""
+    ids = []
+    while bits:
+        low = bits & -bits
+        ids.append(low.bit_length() - 1)
+        bits ^= low
+    return ids
 
 # =============================================================================
 def test_formula():
@@ -0,0 +1,308 @@
+"""Read and write a compiled binary form of the compatibility matrix.
+
+Importing compatibility_matrix.py means evaluating a 3.5 MB dict literal on
+every run.  Instead, the matrix is compiled once into a compact file that is
+opened with mmap, so lookups read straight from the (shared, read-only) page
+cache and forked processes never copy it.
+
+File layout (all integers little-endian uint32):
+
+    header      magic 'NFCM', version, number of types N, number of entries E
+    name_ptr    N+1 offsets into the name blob
+    names       type names, sorted, concatenated (padded to 4 bytes)
+    row_ptr     N+1 offsets into cols/counts, one row per type
+    cols        E column type IDs, sorted within each row
+    counts      E intersection counts
+    col_ptr     N+1 offsets into col_rows/col_entries, one column per type
+    col_rows    T row type IDs, sorted within each column
+    col_entries T offsets into cols/counts of those rows' entries
+
+Type IDs are positions in the sorted list of type names.  Since the matrix is
+symmetric, only the upper triangle (column >= row) is stored, in CSR form.
+The column index (col_ptr etc.) is its transpose, without the diagonal, so
+that a type's whole row is its own row plus its column, without scanning the
+rows of every earlier type.  Rows are read as views into the map, so nothing
+is copied into each process.
+"""
+
+from __future__ import print_function
+
+import os
+import mmap
+import bisect
+import struct
+import tempfile
+
+try: import numpy
+except ImportError: numpy = None  # Only needed for pair_counts().
+
+MAGIC = 'NFCM'
+VERSION = 3
+HEADER = struct.Struct('<4sIII')
+UINT = struct.Struct('<I')
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+SOURCE_PATH = os.path.join(DIRECTORY, 'compatibility_matrix.py')
+DEFAULT_PATH = os.path.join(DIRECTORY, 'compatibility_matrix.bin')
+
+# Error thrown when a compiled matrix file can't be read.
+class CompatibilityFileError(Exception): pass
+
+# =============================================================================
+def write(compatibility, path=DEFAULT_PATH):
+    """Compile a compatibility table, as printed by fetch_compatibility_sort,
+    into a binary file at path.  The file is written under a temporary name
+    and renamed into place, so concurrent readers never see half a file.
+    """
+# =============================================================================
+
+    temp_path = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        with open(temp_path, 'wb') as out: write_to(out, compatibility)
+        os.rename(temp_path, path)
+    except (IOError, OSError):
+        if os.path.exists(temp_path): os.remove(temp_path)
+        raise
+
+def write_to(out, compatibility):
+    """Write the compiled form of a compatibility table to a file."""
+    names = sorted(compatibility)
+    ids = dict((name, id) for (id, name) in enumerate(names))
+
+    name_ptr = [0]
+    for name in names: name_ptr.append(name_ptr[-1] + len(name))
+    blob = ''.join(names)
+    blob += '\0' * (-len(blob) % 4)
+
+    row_ptr = [0]
+    cols = []
+    counts = []
+    column = [[] for name in names]  # (row, entry) for each column.
+    for (row, name) in enumerate(names):
+        # Keep the upper triangle only.  The table is symmetric, so the lower
+        # triangle can be read back by swapping row and column.
+        entries = sorted((ids[other], count)
+                         for (other, count) in compatibility[name].items()
+                         if other in ids and ids[other] >= row)
+        for (col, count) in entries:
+            if col > row: column[col].append((row, len(cols)))
+            cols.append(col)
+            counts.append(count)
+        row_ptr.append(len(cols))
+
+    col_ptr = [0]
+    col_rows = []
+    col_entries = []
+    for entries in column:
+        col_rows += [row for (row, entry) in entries]
+        col_entries += [entry for (row, entry) in entries]
+        col_ptr.append(len(col_rows))
+
+    def pack(values): return struct.pack('<%dI' % len(values), *values)
+
+    out.write(HEADER.pack(MAGIC, VERSION, len(names), len(cols)))
+    out.write(pack(name_ptr))
+    out.write(blob)
+    out.write(pack(row_ptr))
+    out.write(pack(cols))
+    out.write(pack(counts))
+    out.write(pack(col_ptr))
+    out.write(pack(col_rows))
+    out.write(pack(col_entries))
+
+# =============================================================================
+class UIntView:
+    """A read-only sequence of the uint32s at an offset in a map, read on
+    demand.  Enough of a list for bisect and iteration.
+    """
+# =============================================================================
+
+    def __init__(self, map, base, length):
+        self.map = map
+        self.base = base
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.length: raise IndexError(index)
+        return UINT.unpack_from(self.map, self.base + 4 * index)[0]
+
+    def __iter__(self):
+        return iter(struct.unpack_from('<%dI' % self.length, self.map,
+                                       self.base))
+
+# =============================================================================
+class CompatibilityFile:
+    """A read-only, memory-mapped view of a compiled compatibility matrix,
+    given its path or an open file.  Nothing is decoded up front; every
+    lookup reads directly from the map.
+    """
+# =============================================================================
+
+    def __init__(self, path=DEFAULT_PATH):
+        if isinstance(path, basestring):
+            with open(path, 'rb') as f:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.map = mmap.mmap(path.fileno(), 0, access=mmap.ACCESS_READ)
+            path = getattr(path, 'name', path)
+        (magic, version, self.num_types, self.num_entries) = \
+                HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise CompatibilityFileError(
+                    "%s is not a version %d compatibility file"
+                    % (path, VERSION))
+        self.name_ptr = HEADER.size
+        self.names = self.name_ptr + 4 * (self.num_types + 1)
+        names_size = self.uint(self.name_ptr, self.num_types)
+        self.row_ptr = self.names + names_size + (-names_size % 4)
+        self.cols = self.row_ptr + 4 * (self.num_types + 1)
+        self.counts = self.cols + 4 * self.num_entries
+        self.col_ptr = self.counts + 4 * self.num_entries
+        num_col_entries = self.uint(self.col_ptr, self.num_types)
+        self.col_rows = self.col_ptr + 4 * (self.num_types + 1)
+        self.col_entries = self.col_rows + 4 * num_col_entries
+        self.ids = {}  # Type IDs that have been looked up so far.
+        self.pair_keys = None  # See pair_counts().
+
+    def uint(self, base, index):
+        return UINT.unpack_from(self.map, base + 4 * index)[0]
+
+    def name(self, id):
+        """Return the type name with the given ID."""
+        start = self.uint(self.name_ptr, id)
+        end = self.uint(self.name_ptr, id + 1)
+        return self.map[self.names + start:self.names + end]
+
+    def type_id(self, name):
+        """Return the ID of a type name, or None if it isn't in the matrix.
+        Binary searches the sorted name list.
+        """
+        if name in self.ids: return self.ids[name]
+        (low, high) = (0, self.num_types)
+        while low < high:
+            middle = (low + high) // 2
+            if self.name(middle) < name: low = middle + 1
+            else: high = middle
+        id = None
+        if low < self.num_types and self.name(low) == name: id = low
+        self.ids[name] = id
+        return id
+
+    def __contains__(self, name):
+        return self.type_id(name) is not None
+
+    def __len__(self):
+        return self.num_types
+
+    def type_names(self):
+        """Iterate over all type names, in ID order."""
+        for id in range(self.num_types): yield self.name(id)
+
+    def views(self, ptr, first, second, id):
+        """Return views of the slices of two arrays for one row (of the
+        matrix or of the column index).
+        """
+        start = self.uint(ptr, id)
+        length = self.uint(ptr, id + 1) - start
+        return (UIntView(self.map, first + 4 * start, length),
+                UIntView(self.map, second + 4 * start, length))
+
+    def count_by_id(self, id1, id2):
+        """Return the intersection count for two type IDs, or None if the pair
+        is missing from the matrix.
+        """
+        if id1 > id2: (id1, id2) = (id2, id1)
+        start = self.uint(self.row_ptr, id1)
+        length = self.uint(self.row_ptr, id1 + 1) - start
+        # (Rows are short, so unpacking the columns for bisect to search in C
+        # is faster than bisecting a view.  Nothing is kept.)
+        cols = struct.unpack_from('<%dI' % length, self.map,
+                                  self.cols + 4 * start)
+        index = bisect.bisect_left(cols, id2)
+        if index < length and cols[index] == id2:
+            return self.uint(self.counts, start + index)
+        return None
+
+    def count(self, type1, type2):
+        """Return the number of objects in both types, or None if the pair
+        (or either type) is missing from the matrix.
+        """
+        id1 = self.ids[type1] if type1 in self.ids else self.type_id(type1)
+        id2 = self.ids[type2] if type2 in self.ids else self.type_id(type2)
+        if id1 is None or id2 is None: return None
+        return self.count_by_id(id1, id2)
+
+    def pair_counts(self, keys):
+        """Look up many pairs of type IDs at once, with numpy.  keys is an
+        array of row * len(self) + col for pairs with row <= col, and the
+        result is an array of their counts, with -1 for missing pairs.
+
+        Since the rows of the upper triangle are stored in order, with their
+        columns sorted, the keys of the stored entries are already sorted, so
+        the whole batch is looked up with one binary search (searchsorted).
+        """
+        if self.pair_keys is None:
+            def view(base, length):
+                return numpy.frombuffer(self.map, dtype='<u4', count=length,
+                                        offset=base)
+            row_ptr = view(self.row_ptr, self.num_types + 1)
+            rows = numpy.repeat(numpy.arange(self.num_types),
+                                numpy.diff(row_ptr)).astype(numpy.int64)
+            cols = view(self.cols, self.num_entries).astype(numpy.int64)
+            self.pair_keys = rows * self.num_types + cols
+            self.pair_values = view(self.counts, self.num_entries) \
+                                   .astype(numpy.int64)
+        keys = numpy.asarray(keys, dtype=numpy.int64)
+        if not self.num_entries: return numpy.zeros(len(keys), numpy.int64) - 1
+        index = numpy.searchsorted(self.pair_keys, keys)
+        index = numpy.minimum(index, self.num_entries - 1)
+        found = self.pair_keys[index] == keys
+        return numpy.where(found, self.pair_values[index], -1)
+
+    def row(self, name):
+        """Iterate over (type, count) for every type compatible with the given
+        type.  This is the equivalent of compatibility[name].items().
+        """
+        id = self.type_id(name)
+        if id is None: return
+        # Lower triangle: the rows of earlier types with this type's column.
+        for (row, entry) in zip(*self.views(self.col_ptr, self.col_rows,
+                                            self.col_entries, id)):
+            yield (self.name(row), self.uint(self.counts, entry))
+        # Upper triangle: this type's own row.
+        for (col, count) in zip(*self.views(self.row_ptr, self.cols,
+                                            self.counts, id)):
+            yield (self.name(col), count)
+
+# =============================================================================
+def load(path=DEFAULT_PATH):
+    """Open the compiled compatibility matrix, (re)compiling it first from
+    compatibility_matrix.py if it's missing, older than its source, or from
+    an older version of this module.
+    """
+# =============================================================================
+
+    if os.path.exists(SOURCE_PATH) and (not os.path.exists(path) or
+            os.path.getmtime(path) < os.path.getmtime(SOURCE_PATH)):
+        return compile_source(path)
+    try: return CompatibilityFile(path)
+    except CompatibilityFileError:
+        if not os.path.exists(SOURCE_PATH): raise
+        return compile_source(path)
+
+def compile_source(path):
+    """Compile compatibility_matrix.py to path and open it.  If path can't be
+    written (e.g. in a read-only checkout), compile to a temporary file that
+    only this process uses instead.
+    """
+    from compatibility_matrix import compatibility
+    try: write(compatibility, path)
+    except (IOError, OSError):
+        temp = tempfile.TemporaryFile()
+        write_to(temp, compatibility)
+        temp.flush()
+        return CompatibilityFile(temp)
+    return CompatibilityFile(path)
@@ -2,6 +2,9 @@
 metaschema relations, countries adjectives, ethnicities, etc. and print out
 tables taking these words to their meanings.  (Or in the case of the type and
 property tables, from Freebase meanings to English words).
+
+Query results are fetched a page at a time as the tables are built (see
+freebase_results()), rather than all being held at once.
 """
 
 from __future__ import print_function
@@ -11,7 +14,7 @@ import json
 import inflect
 import pprint
 
-from freebase_query import freebase_query
+from freebase_query import freebase_results
 
 def format_name(name, force_ascii=True, lowercase=True,
                 back_to_forward_slash=True, underscore_to_space=True,
@@ -55,7 +58,7 @@ def print_noun_table():
         'sort': '-instance.estimate-count'
     }]
 
-    response = freebase_query(query, all=True, verbose=True)
+    results = freebase_results(query, verbose=True)
 
     print('"""This is an auto-generated file mapping an English noun to\n'
           '(potentially multiple) Freebase type interpretations.\n'
@@ -66,7 +69,7 @@ def print_noun_table():
     infl = inflect.engine()  # For making plurals.
 
     table = {}
-    for type in response:
+    for type in results:
         id = str(type['id'])
         names = [type['name']] + \
                 [ alias['value'] for alias in type['/common/topic/alias'] ]
@@ -97,7 +100,7 @@ def print_type_table():
         'sort': '-instance.estimate-count'
     }]
 
-    response = freebase_query(query, all=True, verbose=True)
+    results = freebase_results(query, verbose=True)
 
     print('"""This is an auto-generated file mapping a Freebase type to a\n'
           'canonical name for that type.\n'
@@ -106,7 +109,7 @@ def print_type_table():
     print('table = \\')
 
     table = {}
-    for type in response:
+    for type in results:
         id = str(type['id'])
         table[id] = format_name(type['name'])
 
@@ -125,7 +128,7 @@ def print_property_table():
         'type': '/type/property', 'id': None, 'name': None
     }]
 
-    response = freebase_query(query, all=True, verbose=True)
+    results = freebase_results(query, verbose=True)
 
     print('"""This is an auto-generated file mapping a Freebase property to\n'
           'a canonical English equivalent.\n'
@@ -134,7 +137,7 @@ def print_property_table():
     print('table = \\')
 
     prop_table = {}
-    for property in response:
+    for property in results:
         if property['name']:
             prop_table[str(property['id'])] = \
                     format_name(property['name'])
@@ -167,7 +170,7 @@ def print_metaschema_table():
         }]
     }]
 
-    response = freebase_query(query, all=True, verbose=True)
+    results = freebase_results(query, verbose=True)
 
     print('"""This is an auto-generated file mapping a Freebase metaschema\n'
           "predicate to a list of tuples:\n\n"
@@ -182,7 +185,7 @@ def print_metaschema_table():
     print('table = \\')
 
     table = {}
-    for predicate in response:
+    for predicate in results:
         operand = str(predicate['name'])
         table[operand] = []
         for path in predicate['paths']:
@@ -213,7 +216,7 @@ def print_country_table():
                 'value': None, 'optional': 'optional' }],
     }]
     
-    response = freebase_query(query, all=True, verbose=True)
+    results = freebase_results(query, verbose=True)
 
     print('"""This is an auto-generated file mapping a country adjective\n'
           "like 'Canadian' onto a set of IDs of countries denoted\n"
@@ -223,7 +226,7 @@ def print_country_table():
     print('table = \\')
 
     adj_table = {}
-    for country in response:
+    for country in results:
         adjs = country['/location/location/adjectival_form']
         for adj in adjs:
             adj_fmt = format_name(adj['value'], lowercase=False)
@@ -235,16 +238,75 @@ def print_country_table():
 
 # =============================================================================
 def print_ethnicity_table():
-    """Print Freebase ethnicity info as table and rules."""
+    """Print table mapping adjectives onto ethnicities."""
 # =============================================================================
 
     query = [{
         'type': '/people/ethnicity',
         'name': None,
+        'mid': None,
         '/common/topic/alias': [{ 'lang': '/lang/en', 'value': None,
                                   'optional': 'optional' }],
         'people': { 'return': 'count' },
         'sort': '-people.count'
     }]
 
-    response = freebase_query(query, all=True, verbose=True)
+    results = freebase_results(query, verbose=True)
+
+    print('"""This is an auto-generated file mapping an ethnicity adjective\n'
+          "like 'Irish' onto a set of IDs of ethnicities denoted.\n"
+          '"""\n')
+    print('# ===== Adjective Ethnicity Table =====')
+    print('table = \\')
+
+    # Ethnicities are named like 'Irish people' or 'Irish Americans'.  Use
+    # the names and aliases, without any ' people'.
+    adj_table = {}
+    for ethnicity in results:
+        names = [ethnicity['name']]
+        names += [alias['value'] for alias in ethnicity['/common/topic/alias']]
+        for name in names:
+            if not name: continue
+            adj_fmt = format_name(name, lowercase=False)
+            adj_fmt = re.sub(' people$', '', adj_fmt)
+            if adj_fmt.lower() == 'none': continue
+            if adj_fmt not in adj_table: adj_table[adj_fmt] = set()
+            adj_table[adj_fmt] |= { str(ethnicity['mid']) }
+
+    pprint.pprint(adj_table)
+
+# =============================================================================
+def print_cuisine_table():
+    """Print table mapping adjectives onto cuisines."""
+# =============================================================================
+
+    query = [{
+        'type': '/dining/cuisine',
+        'name': None,
+        'mid': None,
+        '/common/topic/alias': [{ 'lang': '/lang/en', 'value': None,
+                                  'optional': 'optional' }],
+    }]
+
+    results = freebase_results(query, verbose=True)
+
+    print('"""This is an auto-generated file mapping a cuisine adjective\n'
+          "like 'Mexican' onto a set of IDs of cuisines denoted.\n"
+          '"""\n')
+    print('# ===== Adjective Cuisine Table =====')
+    print('table = \\')
+
+    # Cuisines are named like 'Mexican food' or 'Mexican cuisine'.
+    adj_table = {}
+    for cuisine in results:
+        names = [cuisine['name']]
+        names += [alias['value'] for alias in cuisine['/common/topic/alias']]
+        for name in names:
+            if not name: continue
+            adj_fmt = format_name(name, lowercase=False)
+            adj_fmt = re.sub(' (food|cuisine)$', '', adj_fmt)
+            if adj_fmt.lower() == 'none': continue
+            if adj_fmt not in adj_table: adj_table[adj_fmt] = set()
+            adj_table[adj_fmt] |= { str(cuisine['mid']) }
+
+    pprint.pprint(adj_table)
@@ -6,11 +6,14 @@ from __future__ import print_function
 
 import re
 
-from freebase_query import freebase_query
+from freebase_query import freebase_results
 
 # =============================================================================
-def print_types():
-    """Queries Freebase for info about types and prints it out."""
+def print_types(checkpoint=None):
+    """Queries Freebase for info about types and prints it out, a page at a
+    time.  With a checkpoint file (see freebase_results()), an interrupted
+    run picks up where it left off.
+    """
 # =============================================================================
 
     # For all types in /commons and /system, look up:
@@ -39,8 +42,7 @@ def print_types():
         'sort': '-instance.estimate-count'
     }]
 
-    response = freebase_query(query, all=True, verbose=True)
-    for type in response:
+    for type in freebase_results(query, verbose=True, checkpoint=checkpoint):
         print('ID: ' + str(type['id']))
         print('  Name: ' + str(type['name']))
         for alias in type['/common/topic/alias']:
@@ -64,8 +66,10 @@ def print_types():
                   + '"')  # str() breaks on utf8 names
 
 # =============================================================================
-def print_metaschema():
-    """Queries Freebase for all metaschema structure and prints it out."""
+def print_metaschema(checkpoint=None):
+    """Queries Freebase for all metaschema structure and prints it out, a page
+    at a time.  checkpoint is as for print_types().
+    """
 # =============================================================================
 
     query = [{
@@ -87,8 +91,8 @@ def print_metaschema():
         }]
     }]
 
-    response = freebase_query(query, all=True, verbose=True)
-    for predicate in response:
+    for predicate in freebase_results(query, verbose=True,
+                                      checkpoint=checkpoint):
         print('Predicate: ' + str(predicate['name']))
         print('Operand: ' + str(predicate['search_filter_operand']))
         for path in predicate['paths']:
@@ -0,0 +1,68 @@
+"""Pack the parses in a chart into a parse forest.
+
+Listing every parse tree of a long query repeats each shared sub-parse (e.g.
+'from Canada') once per tree, and the number of trees grows exponentially with
+the number of PP attachments.  A packed forest has one Node per category and
+span, holding every way of expanding it, so the interpreter can work out each
+Node's meanings once no matter how many trees contain it.
+"""
+
+from nltk.tree import Tree
+from nltk.parse.chart import LeafEdge
+
+class Node:
+    """All the parses of one span of the query as one category.
+
+    node -- The category, as a string (like nltk's Tree.node).
+    span -- (start, end) positions of the span in the parsed words.
+    expansions -- Ways of expanding this node, as Trees whose children are
+            Nodes, Trees (unambiguous preterminals) or words.
+    """
+
+    def __init__(self, label, span, expansions):
+        self.node = label
+        self.span = span
+        self.expansions = expansions
+
+    def __repr__(self):
+        return '<Node %s %d:%d (%d)>' % ((self.node,) + self.span
+                                         + (len(self.expansions),))
+
+def pack(chart, root):
+    """Return the packed forest of a chart's complete parses whose top node is
+    root (a Nonterminal), or None if there are none.
+
+    Preterminals with a single expansion (i.e. almost all of them) are left as
+    plain Trees, with multiword terminals joined into one leaf, as for
+    grammar.join_multiwords().
+    """
+
+    nodes = {}
+
+    def node_for(label, span):
+        if (label, span) in nodes: return nodes[(label, span)]
+        expansions = []
+        seen = set()
+        for edge in chart.select(start=span[0], end=span[1], lhs=label,
+                                 is_complete=True):
+            for child_edges in chart.child_pointer_lists(edge):
+                children = tuple(
+                        child.lhs() if isinstance(child, LeafEdge)
+                        else node_for(child.lhs(), child.span())
+                        for child in child_edges)
+                # (Trees are lists, so compare children by identity.)
+                key = tuple(map(id, children))
+                if key in seen: continue
+                seen.add(key)
+                if all(isinstance(child, basestring) for child in children):
+                    children = (' '.join(children),)
+                expansions.append(Tree(label.symbol(), list(children)))
+        if not expansions: node = None
+        elif len(expansions) == 1 and \
+                all(isinstance(child, basestring) for child in expansions[0]):
+            node = expansions[0]
+        else: node = Node(label.symbol(), span, expansions)
+        nodes[(label, span)] = node
+        return node
+
+    return node_for(root, (0, chart.num_leaves()))
@@ -1,25 +1,100 @@
-"""A general method for querying out to Freebase."""
+"""General methods for querying out to Freebase: one query at a time, or
+several in one batch request.
+"""
 
 from __future__ import print_function
 
+import os
+import re
 import json
+import uuid
 import urllib
+import urlparse
 import codecs
 import locale
 import sys
-import time
+
+from http_pool import ConnectionPool
+from response_cache import ResponseCache
+from rate_limit import TokenBucket
 
 # Wrap sys.stdout into a StreamWriter to allow writing unicode.
 sys.stdout = codecs.getwriter(locale.getpreferredencoding())(sys.stdout) 
 
 api_key = open(".freebase_api_key").read()
-service_url = 'https://www.googleapis.com/freebase/v1/mqlread'
+# (FREEBASE_SERVICE_URL can point at a local stand-in server for testing.)
+service_url = os.environ.get('FREEBASE_SERVICE_URL',
+                             'https://www.googleapis.com/freebase/v1/mqlread')
+
+# Keep-alive connections to the service, shared by the whole process: how many
+# idle ones to keep, and how long (in seconds) to wait on each request.
+POOL_SIZE = 4
+TIMEOUT = 30
+connections = ConnectionPool(service_url, POOL_SIZE, TIMEOUT)
+
+# Where on the same server to send batches of queries (see batch_query()).
+BATCH_PATH = '/batch'
+
+# Responses cached on disk (see response_cache.py): where, for how long (in
+# seconds), and how many.  Set cache to None to always ask Freebase.  When
+# OFFLINE is set, only cached responses are used, however old they are.
+CACHE_PATH = '.freebase_cache'
+CACHE_TTL = 7*24*60*60
+CACHE_ENTRIES = 100000
+cache = ResponseCache(CACHE_PATH, CACHE_TTL, CACHE_ENTRIES)
+OFFLINE = False
+
+# Requests per second, and how many can go at once, for all threads together
+# (see rate_limit.py).  Setting FREEBASE_RATE_FILE shares the limit with other
+# processes using the same file.
+RATE = 10
+BURST = 10
+limiter = TokenBucket(RATE, BURST, os.environ.get('FREEBASE_RATE_FILE'))
+
+class FreebaseError(Exception):
+    """An error response from Freebase (see freebase_results())."""
+
+    def __init__(self, response):
+        Exception.__init__(self, response['error']['message'])
+        self.response = response
+
+def fetch_page(query, cursor, verbose=False, charged=False):
+    """Return Freebase's complete response for one page of a query's results,
+    from the cache if possible.  With charged set, the request has already
+    been counted by the rate limiter.
+    """
+    params = {
+        'query': json.dumps(query),
+        'key': api_key,
+        'cursor': cursor
+    }
+
+    response = cache.get(query, cursor, OFFLINE) if cache else None
+    if response is not None:
+        if verbose: sys.stderr.write('.')
+    elif OFFLINE:
+        response = {'error': {'message': 'Not cached (offline)'}}
+    else:
+        if not charged: limiter.acquire()
+        if verbose: sys.stderr.write('(')
+        response = json.loads(connections.get(urllib.urlencode(params)))
+        if verbose: sys.stderr.write(')')
+        # (Errors aren't cached.)
+        if cache and 'cursor' in response:
+            cache.put(query, cursor, response)
+
+    if 'cursor' not in response:
+        if verbose: sys.stderr.write('\nError!\n')
+        if verbose: sys.stderr.write('Parameters: %s\n' % params)
+    return response
 
 # =============================================================================
-def freebase_query(query, all=False, verbose=False):
+def freebase_query(query, all=False, verbose=False, charged=False):
     """Return the results of running a Freebase query.
     If all is set, repeats the query using a cursor to get all results.
     Otherwise, results beyond limit (around 100 by default?) are cut off.
+    With charged set, the first request has already been counted by the rate
+    limiter.
     """
 # =============================================================================
 
@@ -30,24 +105,9 @@ def freebase_query(query, all=False, verbose=False):
 
     while True:
 
-        params = {
-            'query': json.dumps(query),
-            'key': api_key,
-            'cursor': cursor
-        }
-
-        url = service_url + '?' + urllib.urlencode(params)
-
-        time.sleep(0.1)
-        if verbose: sys.stderr.write('(')
-        response = json.loads(urllib.urlopen(url).read())
-        if verbose: sys.stderr.write(')')
-
+        response = fetch_page(query, cursor, verbose, charged and not cursor)
         if 'cursor' in response: cursor = response['cursor']
-        else:
-            if verbose: sys.stderr.write('\nError!\n')
-            if verbose: sys.stderr.write('Parameters: %s\n' % params)
-            return response  # Return complete response, containing error.
+        else: return response  # Return complete response, containing error.
 
         results += response['result']
 
@@ -56,3 +116,126 @@ def freebase_query(query, all=False, verbose=False):
     if verbose: sys.stderr.write('\n')
 
     return results
+
+# =============================================================================
+def freebase_results(query, verbose=False, checkpoint=None):
+    """Generate all the results of a Freebase query, fetching each page as
+    the results before it are used up, rather than keeping them all.  Raises
+    FreebaseError for an error response.
+
+    checkpoint -- A file to save the cursor of the next page to as each page
+            is used up.  If the file is there (for the same query) when we
+            start, start from that page, skipping those used up before.  It's
+            removed once all the results have been generated.
+    """
+# =============================================================================
+
+    if verbose: sys.stderr.write('Querying Freebase: ')
+
+    cursor = load_checkpoint(checkpoint, query) if checkpoint else ''
+
+    while True:
+
+        response = fetch_page(query, cursor, verbose)
+        if 'cursor' not in response: raise FreebaseError(response)
+        for result in response['result']: yield result
+
+        cursor = response['cursor']
+        if not cursor: break
+        if checkpoint: save_checkpoint(checkpoint, query, cursor)
+
+    if checkpoint and os.path.exists(checkpoint): os.remove(checkpoint)
+    if verbose: sys.stderr.write('\n')
+
+def load_checkpoint(path, query):
+    """Return the cursor saved in a checkpoint file for a query, or '' to
+    start from the beginning.
+    """
+    try:
+        with open(path) as f: saved = json.load(f)
+    except (IOError, ValueError): return ''
+    if saved.get('query') != query: return ''
+    return saved['cursor']
+
+def save_checkpoint(path, query, cursor):
+    # (Written to a temporary file first, so an interruption can't leave a
+    # half-written checkpoint.)
+    temp_path = '%s.%d.tmp' % (path, os.getpid())
+    with open(temp_path, 'w') as f:
+        json.dump({'query': query, 'cursor': cursor}, f)
+    os.rename(temp_path, path)
+
+# =============================================================================
+def freebase_queries(queries):
+    """Return the results of running several Freebase queries, in a list
+    parallel to queries, each as freebase_query() would return it (without
+    all).  Queries that aren't cached are sent in one batch request.
+    """
+# =============================================================================
+
+    results = [None] * len(queries)
+    todo = []  # Indexes of queries that aren't cached.
+    for (index, query) in enumerate(queries):
+        response = cache.get(query, '', OFFLINE) if cache else None
+        if response is not None: results[index] = response['result']
+        else: todo.append(index)
+
+    if OFFLINE:
+        for index in todo:
+            results[index] = {'error': {'message': 'Not cached (offline)'}}
+    elif len(todo) == 1:
+        results[todo[0]] = freebase_query(queries[todo[0]])
+    elif todo:
+        # (Each query in a batch counts against the quota.)
+        limiter.acquire(len(todo))
+        batch = batch_query([queries[index] for index in todo])
+        if batch is None:
+            # Not a batch response.  Ask for each query separately instead,
+            # which the tokens taken for the batch already cover.
+            for index in todo:
+                results[index] = freebase_query(queries[index], charged=True)
+        else:
+            for (index, response) in zip(todo, batch):
+                if 'cursor' in response:
+                    if cache: cache.put(queries[index], '', response)
+                    results[index] = response['result']
+                else: results[index] = response  # Error.
+
+    return results
+
+def batch_query(queries):
+    """Send queries to Freebase as the parts of one multipart/mixed batch
+    request (see BATCH_PATH), and return their raw responses, or None if the
+    response isn't a batch.  Parts missing from the response come back as
+    errors.
+    """
+    boundary = 'batch_%s' % uuid.uuid4().hex
+    path = urlparse.urlsplit(service_url).path
+    parts = []
+    for (index, query) in enumerate(queries):
+        params = urllib.urlencode({'query': json.dumps(query),
+                                   'key': api_key})
+        parts.append('--%s\r\nContent-Type: application/http\r\n'
+                     'Content-ID: <item%d>\r\n\r\nGET %s?%s\r\n'
+                     % (boundary, index, path, params))
+    body = '\r\n'.join(parts) + '\r\n--%s--\r\n' % boundary
+    # (The batch only holds mqlread GETs, so it's safe to send again.)
+    (content_type, body) = connections.send('POST', BATCH_PATH, body,
+            {'Content-Type': 'multipart/mixed; boundary=%s' % boundary},
+            retry=True)
+
+    match = re.match(r'multipart/mixed;.*boundary="?([^";]+)', content_type)
+    if not match: return None
+    responses = [{'error': {'message': 'No response in batch'}}] * len(queries)
+    for part in body.split('--' + match.group(1)):
+        # Each part is MIME headers (including the Content-ID of the request
+        # it answers), then an HTTP response's status and headers, then its
+        # body.
+        sections = re.split(r'\r?\n\r?\n', part.strip(), 2)
+        if len(sections) < 3: continue
+        item = re.search(r'Content-ID: <response-item(\d+)>', sections[0],
+                         re.IGNORECASE)
+        if not item or int(item.group(1)) >= len(queries): continue
+        try: responses[int(item.group(1))] = json.loads(sections[2])
+        except ValueError: pass
+    return responses
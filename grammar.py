@@ -2,16 +2,29 @@
 English query.  All non-terminal rules appear hear.  Terminal rules that are
 autogenerated from Freebase types, metaschema, etc. are imported from the
 lexicon.
+
+There are two versions of the grammar:
+
+    rules -- The full grammar, with every word in the lexicon.  Building a
+            parser for this takes seconds, so it's only used for debugging.
+    rules_for(words) -- The non-lexical rules, plus lexicon rules for just the
+            given words (i.e. the lexicon words found in a query).
+
+Multiword lexicon entries are spelled as sequences of terminals (N -> 'musical'
+'recording'), so that overlapping multiwords can be parsed together.  Parse
+trees should be passed through join_multiwords() before interpreting them.
 """
 
 from lexicon import lexicon
 
-rules = "% start DP\n"
+# Words for the auto-generated lexical categories.
+lexical_words = {
+    'N': set(lexicon.N_table),
+    'A': set(lexicon.A_table),
+    'P': set(lexicon.pred_index),
+}
 
-# Add all the auto-generated rules from the lexicon.
-rules += '\n'.join(lexicon.rules.values())
-
-rules += """
+base_rules = """
 
 # ===== Brackets =====
 
@@ -48,7 +61,6 @@ OF -> 'of'
 P -> 'rel' | 'Rel' | 'REL'
 P -> 'with'
 A -> 'different'
-A -> 'female' | 'male'
 # Magic operator for "help N" queries
 N -> 'help' | 'Help' | 'HELP'
 # Relational nouns
@@ -58,3 +70,34 @@ N -> 'man' | 'men' | 'novel' | 'novels' | 'woman' | 'women'
 N -> 'anyone' | 'anything' | 'someone' | 'something' | 'thing' | 'things'
 
 """
+
+def rules_for(words):
+    """Return grammar rules with the same non-lexical rules as the full
+    grammar, but with auto-generated lexical rules only for the given words.
+    """
+    words = set(words)
+    scoped_rules = "% start DP\n"
+    for cat in sorted(lexical_words):
+        cat_words = sorted(words & lexical_words[cat])
+        if cat_words:
+            scoped_rules += '%s -> ' % cat
+            scoped_rules += ' | '.join([' '.join(["'" + x + "'"
+                                                  for x in word.split()])
+                                        for word in cat_words])
+            scoped_rules += '\n'
+    return scoped_rules + base_rules
+
+# Full grammar, including all the auto-generated rules from the lexicon.
+rules = rules_for(set().union(*lexical_words.values()))
+
+def join_multiwords(tree):
+    """Join the words under each preterminal of a parse tree (e.g. N ->
+    'musical' 'recording') into a single leaf ('musical recording'), which is
+    what the interpreter expects.  Changes the tree in place.
+    """
+    if all(isinstance(child, basestring) for child in tree):
+        if len(tree) > 1: tree[:] = [' '.join(tree)]
+    else:
+        for child in tree:
+            if not isinstance(child, basestring): join_multiwords(child)
+    return tree
@@ -1,13 +1,17 @@
 """Create a list of all the words in grammar.py"""
 
 import re
-from grammar import rules
+from grammar import base_rules, lexical_words
 
 # Fancy regex to match single-quoted strings (which can contain backslashed
 # single quotes).
 regex = re.compile(r"""(?<!\\)(?:\\\\)*'([^'\\]*(?:\\.[^'\\]*)*)'""",
                    re.MULTILINE)
 
+# Lexicon words come straight from the lexicon, rather than searching the whole
+# (huge) grammar for them.
 words = set()
-for match in regex.finditer(rules):
+for cat_words in lexical_words.values():
+    words |= cat_words
+for match in regex.finditer(base_rules):
     words |= { match.group(1) }
@@ -0,0 +1,116 @@
+"""A pool of persistent (keep-alive) HTTP connections to one server, so that
+requests after the first don't each pay for a new TCP (and TLS) handshake.
+Responses are asked for gzipped, and decompressed here.
+
+The pool is safe to use from several threads at once (see query_pool.py):
+each request takes an idle connection, or opens a new one, and gives it back
+afterwards.  At most size idle connections are kept.
+"""
+
+import zlib
+import socket
+import httplib
+import urlparse
+import threading
+
+# Methods that can safely be sent again if a reused connection fails, since
+# the server may have acted on the first attempt before it went away.
+IDEMPOTENT = set(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+
+class ConnectionPool:
+    """Keep-alive connections to the server of a URL, e.g.
+    'https://www.googleapis.com/freebase/v1/mqlread' or, for testing,
+    'http://localhost:8000/mqlread'.
+
+    size -- How many idle connections to keep open.
+    timeout -- Default socket timeout (in seconds) for each request, or None
+            to wait forever.
+    """
+
+    def __init__(self, url, size=4, timeout=30):
+        parts = urlparse.urlsplit(url)
+        if parts.scheme == 'https': self.connection_class = \
+                httplib.HTTPSConnection
+        elif parts.scheme == 'http': self.connection_class = \
+                httplib.HTTPConnection
+        else: raise ValueError("Can't pool connections for '%s'" % url)
+        self.host = parts.netloc
+        self.path = parts.path or '/'
+        self.size = size
+        self.timeout = timeout
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def get(self, query_string='', timeout=None):
+        """GET the URL with a query string added, and return the response
+        body (whatever the status, since Freebase explains errors in the
+        body).  timeout overrides the pool's default.
+        """
+        path = self.path
+        if query_string: path += '?' + query_string
+        return self.send('GET', path, timeout=timeout)[1]
+
+    def send(self, method, path, body=None, headers={}, timeout=None,
+             retry=None):
+        """Make a request for any path on the server, and return the
+        response's (Content-Type, body).  retry says whether the request may
+        be sent again if a reused connection fails; by default, only
+        IDEMPOTENT methods are.
+        """
+        if timeout is None: timeout = self.timeout
+        if retry is None: retry = method in IDEMPOTENT
+        for attempt in range(2):
+            if attempt == 0: connection = self.take()
+            else: connection = self.connection_class(self.host)
+            # A connection that's been idle may have been closed by the
+            # server, in which case try again once on a new one.
+            reused = connection.sock is not None
+            try: (response, keep) = self.request(connection, method, path,
+                                                 body, headers, timeout)
+            except socket.timeout:
+                connection.close()
+                raise
+            except (httplib.HTTPException, socket.error):
+                connection.close()
+                if reused and retry and attempt == 0: continue
+                raise
+            break
+        if keep: self.give_back(connection)
+        else: connection.close()
+        return response
+
+    def request(self, connection, method, path, body, headers, timeout):
+        """Make one request on a connection.  Returns ((Content-Type, body),
+        whether the connection can be used again).
+        """
+        connection.timeout = timeout  # For connect().
+        if connection.sock is not None: connection.sock.settimeout(timeout)
+        headers = dict(headers, **{'Accept-Encoding': 'gzip',
+                                   'Connection': 'keep-alive'})
+        connection.request(method, path, body, headers)
+        response = connection.getresponse()
+        body = response.read()
+        if response.getheader('content-encoding', '').lower() == 'gzip':
+            # (16 + MAX_WBITS means expect a gzip header.)
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        return ((response.getheader('content-type', ''), body),
+                not response.will_close)
+
+    def take(self):
+        """Return an idle connection, or a new one if there are none."""
+        with self.lock:
+            if self.idle: return self.idle.pop()
+        return self.connection_class(self.host, timeout=self.timeout)
+
+    def give_back(self, connection):
+        with self.lock:
+            if len(self.idle) < self.size:
+                self.idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        """Close all idle connections."""
+        with self.lock:
+            (idle, self.idle) = (self.idle, [])
+        for connection in idle: connection.close()
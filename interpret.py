@@ -1,11 +1,28 @@
 """Define interpretation functions DP(), NP(), NBar(), A(), N() that take Tree
 objects and return possible interpretations, as lists of TypedMeanings.
+
+They also take packed forest Nodes (see forest.py), interpreting each
+expansion of the Node and returning all of the results.
+
+Meanings made by combining the meanings of two children are worked out
+lazily, best first (see combine()), and are returned as Meanings rather than
+lists.  Only as many as the DPs above them keep for ACCURACY ever get made.
+
+Work is remembered for the whole query, across the passes made with
+increasing ACCURACY: each node's results are reused as long as no meanings
+below it were cut for accuracy, and otherwise only combinations of meanings
+that weren't seen on an earlier pass are worked out (see pair()).  Call
+forget() before interpreting a new query.
 """
 
-import re
+import heapq
 from nltk.tree import Tree
 
-from compatibility import compatible
+import forest
+from mql import Query
+
+from compatibility import compatible, compatible_many
+from type_ids import type_set
 from lexicon import lexicon
 
 FUZZY_NAMES = False
@@ -20,7 +37,27 @@ ACCURACY = 10
 # again with higher accuracy.
 MADE_ACCURACY_CUTS = False
 
-unique_prefix = 0
+# (ACCURACY, results, whether meanings were cut) for each interpretation
+# function and node (a forest Node, or the id of a Tree).
+memo = {}
+
+# Results of combining pairs of meanings (see pair()).
+pairs = {}
+
+# Compatibility of sets of types with the subject or object types of predicate
+# senses (see score_senses()).
+sense_fits = {}
+
+# Every predicate sense, with its predicate's lexicalizations, for 'rel'.
+all_senses = [(sense, predicate.lexicalizations)
+              for predicate in lexicon.pred_table.values()
+              for sense in predicate.senses]
+
+def forget():
+    """Forget the work remembered for earlier queries."""
+    memo.clear()
+    pairs.clear()
+    sense_fits.clear()
 
 class TypedMeaning:
     """A TypedMeaning represents one possible interpretation of a Tree node,
@@ -29,17 +66,80 @@ class TypedMeaning:
     """
 
     def __init__(self, types=None, sem=None, reln=None, fit=1):
-        self.types = types  # Set of required Freebase types.
-        self.sem = sem      # Semantics, as a Freebase query.
+        self.types = types  # Required Freebase types, as a type_ids bitset.
+        self.sem = sem      # Semantics, as an mql.Query.
         self.reln = reln    # Relational noun head of phrase.
         self.fit = fit      # How good a fit this meaning is.
 
+class Meanings:
+    """The meanings of a node, worked out lazily in order of decreasing fit.
+
+    Each item is (-fit, order, meaning), where order is a tuple that sorts in
+    the order the meanings would have been listed in if they were all worked
+    out up front.  Ties in fit are broken by order, just as sorting that list
+    by fit (stably) would.
+    """
+
+    def __init__(self, items):
+        self.done = []           # Items worked out so far.
+        self.more = iter(items)  # The rest, best first.
+
+    def get(self, index):
+        """Return item number index, or None if there aren't that many."""
+        while len(self.done) <= index:
+            item = next(self.more, None)
+            if item is None: return None
+            self.done.append(item)
+        return self.done[index]
+
+    def items(self):
+        index = 0
+        while True:
+            item = self.get(index)
+            if item is None: return
+            yield item
+            index += 1
+
+    def best(self, N):
+        """Like best(), but only works out the meanings it returns (and the
+        one after, to tell whether any were cut).
+        """
+        global MADE_ACCURACY_CUTS
+        results = []
+        for meaning in distinct(meaning for (_, _, meaning) in self.items()):
+            if len(results) >= N and meaning.fit <= results[N-1].fit * 0.99:
+                MADE_ACCURACY_CUTS = True
+                break
+            results.append(meaning)
+        return results
+
+def lazy(meanings):
+    """Return a list of meanings (or Meanings) as Meanings."""
+    if isinstance(meanings, Meanings): return meanings
+    return Meanings(sorted((-meaning.fit, (index,), meaning)
+                           for (index, meaning) in enumerate(meanings)))
+
+def distinct(meanings):
+    """Yield the meanings that differ from all the meanings before them in
+    semantics, types or relational noun head.  (Meanings that differ only in
+    fit would make the same combinations further up, with worse fits.)
+    """
+    seen = set()
+    for meaning in meanings:
+        key = (meaning.sem, meaning.types, meaning.reln)
+        if key not in seen:
+            seen.add(key)
+            yield meaning
+
 def best(N, meanings):
     """Returns the N TypedMeanings with best fit.  Can return more than N in
-    the case of ties (or near-ties) for the Nth best."""
+    the case of ties (or near-ties) for the Nth best.  Of meanings that are
+    the same but for fit, only the best is kept (see distinct())."""
     global MADE_ACCURACY_CUTS
-    length = len(meanings)
-    meanings_by_fit = sorted(meanings, key=lambda x: x.fit, reverse=True)
+    if isinstance(meanings, Meanings): return meanings.best(N)
+    meanings_by_fit = list(distinct(sorted(meanings, key=lambda x: x.fit,
+                                           reverse=True)))
+    length = len(meanings_by_fit)
     if length <= N:
         return meanings_by_fit
     threshold = meanings_by_fit[N-1].fit
@@ -51,6 +151,111 @@ def best(N, meanings):
     if cutoff < length: MADE_ACCURACY_CUTS = True
     return meanings_by_fit[:cutoff]
 
+def expansion_items(index, meanings):
+    """Yield the items of the meanings of a Node's expansion number index,
+    ordered as if the expansions' meanings had been listed one after another.
+    """
+    for (fit, order, meaning) in lazy(meanings).items():
+        yield (fit, (index, order), meaning)
+
+def interpretation(function):
+    """Decorate an interpretation function so that it also takes forest Nodes,
+    and remembers its results for each node (see memo).
+    """
+    def interpret(tree):
+        global MADE_ACCURACY_CUTS
+        if isinstance(tree, forest.Node): key = (function, tree)
+        else: key = (function, id(tree))
+        if key in memo:
+            (accuracy, results, cuts) = memo[key]
+            # Without cuts, higher accuracy wouldn't change anything.
+            if accuracy == ACCURACY or not cuts:
+                MADE_ACCURACY_CUTS = MADE_ACCURACY_CUTS or cuts
+                return results
+        made_cuts = MADE_ACCURACY_CUTS
+        MADE_ACCURACY_CUTS = False
+        if isinstance(tree, forest.Node):
+            results = [function(expansion) for expansion in tree.expansions]
+            if any(isinstance(meanings, Meanings) for meanings in results):
+                results = Meanings(heapq.merge(*[
+                        expansion_items(index, meanings)
+                        for (index, meanings) in enumerate(results)]))
+            else: results = sum(results, [])
+        else: results = function(tree)
+        memo[key] = (ACCURACY, results, MADE_ACCURACY_CUTS)
+        MADE_ACCURACY_CUTS = made_cuts or MADE_ACCURACY_CUTS
+        return results
+    interpret.__name__ = function.__name__
+    interpret.__doc__ = function.__doc__
+    return interpret
+
+def both_fits(left, right):
+    return left.fit * right.fit
+
+def right_fit(left, right):
+    return right.fit
+
+def combine(rule, tree, lefts, rights, bound=both_fits):
+    """Return Meanings of all the results of rule(tree, left, right) for each
+    left and right meaning (given as lists or Meanings).
+
+    Pairs are tried best first, cube pruning style: bound(left, right) must be
+    at least the fit of any result of the pair, and can't decrease when either
+    fit increases.  (Fits are products of child fits and compatibilities, which
+    are at most 1.)  A result is only given once no untried pair could beat
+    it, so the results come in order of decreasing fit, and pairs whose bound
+    is too low to matter are never tried at all.
+    """
+    (lefts, rights) = (lazy(lefts), lazy(rights))
+
+    def results():
+        queued = set()
+        untried = []  # (-bound, left index, right index)
+        found = []    # Items of results of tried pairs, not yet given.
+
+        def add(i, j):
+            if (i, j) in queued: return
+            (left, right) = (lefts.get(i), rights.get(j))
+            if left is None or right is None: return
+            queued.add((i, j))
+            heapq.heappush(untried, (-bound(left[2], right[2]), i, j))
+
+        add(0, 0)
+        while untried or found:
+            while untried and (not found or untried[0][0] <= found[0][0]):
+                (_, i, j) = heapq.heappop(untried)
+                (_, left_order, left) = lefts.get(i)
+                (_, right_order, right) = rights.get(j)
+                for (k, meaning) in enumerate(pair(rule, tree, left, right)):
+                    heapq.heappush(found, (-meaning.fit,
+                                           (left_order, right_order, k),
+                                           meaning))
+                add(i + 1, j)
+                add(i, j + 1)
+            if found: yield heapq.heappop(found)
+
+    return Meanings(results())
+
+def combine_all(rule, tree, lefts, rights):
+    """Return all the results of rule(tree, left, right) for each left and
+    right meaning (given as lists or Meanings), as a list.
+    """
+    results = []
+    for (_, _, left) in lazy(lefts).items():
+        for (_, _, right) in lazy(rights).items():
+            results += pair(rule, tree, left, right)
+    return results
+
+def pair(rule, tree, left, right):
+    """Return rule(tree, left, right).  The results for each pair are
+    remembered, so when a deeper pass lets more meanings through, only the new
+    pairs are worked out.
+    """
+    key = (rule, id(tree), left, right)
+    if key not in pairs: pairs[key] = rule(tree, left, right)
+    return pairs[key]
+
+@interpretation
 def DP(tree):
     results = []
     if isinstance(tree[0], basestring):
@@ -66,23 +271,24 @@ def DP(tree):
         # easy way around this problem.
 
         # 'name' matches.
-        results.append(TypedMeaning(types=set(),
-                sem="'mid': null, 'name': '%s'" % tree[0], fit=1))
+        results.append(TypedMeaning(types=type_set(),
+                sem=Query(('mid', None), ('name', tree[0])), fit=1))
         # 'alias' matches.
-        results.append(TypedMeaning(types=set(),
-                sem="'mid': null, 'name': null, "
-                      "'/common/topic/alias': '%s'"
-                      % tree[0], fit=1-10**-6))  # Just a tad less than 1.
+        results.append(TypedMeaning(types=type_set(),
+                sem=Query(('mid', None), ('name', None),
+                          ('/common/topic/alias', tree[0])),
+                fit=1-10**-6))  # Just a tad less than 1.
         if FUZZY_NAMES:
             # 'name' contains matching word.
-            results.append(TypedMeaning(types=set(),
-                    sem="'mid': null, 'name': null, 'name~=': '%s'"
-                          % tree[0], fit=1-10**-4))  # A bit further from 1.
+            results.append(TypedMeaning(types=type_set(),
+                    sem=Query(('mid', None), ('name', None),
+                              ('name~=', tree[0])),
+                    fit=1-10**-4))  # A bit further from 1.
             # 'alias' contains matching word.
-            results.append(TypedMeaning(types=set(),
-                    sem="'mid': null, 'name': null,"
-                          "'/common/topic/alias~=': '%s'"
-                          % tree[0], fit=1-10**-2))  # Still further from 1.
+            results.append(TypedMeaning(types=type_set(),
+                    sem=Query(('mid', None), ('name', None),
+                              ('/common/topic/alias~=', tree[0])),
+                    fit=1-10**-2))  # Still further from 1.
     elif tree[0].node == 'NP':
         results = NP(tree[0])
     # Ignore determiners.
@@ -94,6 +300,7 @@ def DP(tree):
     else: raise Exception("Can't interpret DP.")
     return best(ACCURACY, results)
 
+@interpretation
 def NP(tree):
 
 #   def add_NBar_modifier(NP_tree, NBar_modifier):
@@ -123,88 +330,73 @@ def NP(tree):
 
     # NP -> A NP
     elif tree[0].node == 'A':
-        (a_meanings, np_meanings) = (A(tree[0]), NP(tree[1]))
-        for a in a_meanings:
-            for np in np_meanings:
-                # Restaurant NP has cuisine-type A.
-                comp_a = compatible(a.types, {'/dining/cuisine'})
-                comp_np = compatible(np.types, {'/dining/restaurant'})
-                if min(comp_a, comp_np) > 0:
-                    results.append(TypedMeaning(
-                            types={'/dining/restaurant'} | np.types,
-                            sem=np.sem + ", '/dining/restaurant/cuisine': " \
-                                       + "[{" + a.sem + "}]",
-                            reln=np.reln, fit=comp_np*np.fit))
-                # Person NP has nationality A.
-                comp_a = compatible(a.types, {'/location/country'})
-                comp_np = compatible(np.types, {'/people/person'})
-                if min(comp_a, comp_np) > 0:
-                    results.append(TypedMeaning(
-                            types={'/people/person'} | np.types,
-                            sem=np.sem + ", '/people/person/nationality': " \
-                                       + "[{" + a.sem + "}]",
-                            reln=np.reln, fit=comp_np*np.fit))
-                # Person NP has ethnicity A.
-                comp_a = compatible(a.types, {'/people/ethnicity'})
-                comp_np = compatible(np.types, {'/people/person'})
-                if min(comp_a, comp_np) > 0:
-                    results.append(TypedMeaning(
-                            types={'/people/person'} | np.types,
-                            sem=np.sem + ", '/people/person/ethnicity': " \
-                                       + "[{" + a.sem + "}]",
-                            reln=np.reln, fit=comp_np*np.fit))
-                # Person NP has gender A.
-                comp_a = compatible(a.types, {'/people/gender'})
-                comp_np = compatible(np.types, {'/people/person'})
-                if min(comp_a, comp_np) > 0:
-                    results.append(TypedMeaning(
-                            types={'/people/person'} | np.types,
-                            sem=np.sem + ", '/people/person/gender': " \
-                                       + "[{" + a.sem + "}]",
-                            reln=np.reln, fit=comp_np*np.fit))
-                # Fictional character NP has (fictional) gender A.
-                comp_a = compatible(a.types, \
-                        {'/fictional_universe/character_gender'})
-                comp_np = compatible(np.types, \
-                        {'/fictional_universe/fictional_character'})
-                if min(comp_a, comp_np) > 0:
-                    results.append(TypedMeaning(
-                            types={'/fictional_universe/fictional_' \
-                                    + 'character'} | np.types,
-                            sem=np.sem + ', ' + "'/fictional_universe/" \
-                                       + "fictional_character/gender': "\
-                                       + "[{" + a.sem + "}]",
-                            reln=np.reln, fit=comp_np*np.fit))
+        results = combine(A_NP, tree, A(tree[0]), NP(tree[1]),
+                          right_fit)
     else: raise Exception("Can't interpret NP.")
     return results
 
-def pred_meaning(sense, nbar, dp):
-    """Checks if NBar (as subject) and DP (as object) are
-    potentially compatible with the sense in question.  If so,
-    returns the TypedMeaning result of combining the two in
-    this sense.  Otherwise returns None.
+def A_NP(tree, a, np):
+    """Interpret NP -> A NP for one meaning each of the A and the NP, using the
+    relations in lexicon.A_rel_table that the A's types fit.
+    """
+    results = []
+    for (head_types, property) in A_relations(a.types):
+        comp_np = compatible(np.types, head_types)
+        if comp_np > 0:
+            results.append(TypedMeaning(
+                    types=head_types | np.types,
+                    sem=np.sem.plus((property, a.sem)),
+                    reln=np.reln, fit=comp_np*np.fit))
+    return results
+
+# The (head types, property) relations that adjective meanings of each set of
+# types can modify NPs by (see A_relations()).
+a_relations = {}
+
+def A_relations(types):
+    """Return the (head types, property) relations in lexicon.A_rel_table for
+    the adjective types that an adjective meaning's types are compatible with.
+    Only these are worth trying in A_NP().
+    """
+    relations = a_relations.get(types)
+    if relations is None:
+        relations = a_relations[types] = [
+                (type_set(head_type), property)
+                for adj_type in sorted(lexicon.A_rel_table)
+                if compatible(types, type_set(adj_type)) > 0
+                for (head_type, property) in lexicon.A_rel_table[adj_type]]
+    return relations
+
+def pred_meaning(sense, nbar, dp, comp_nbar, comp_dp):
+    """Given the compatibility of NBar (as subject) and DP (as object) with
+    the sense in question (see score_senses()), checks if they are potentially
+    compatible.  If so, returns the TypedMeaning result of combining the two
+    in this sense.  Otherwise returns None.
     """
 
-    global unique_prefix
-    comp_nbar = compatible(nbar.types, {sense.S_type})
-    comp_dp = compatible(dp.types, {sense.O_type})
     if min(comp_nbar, comp_dp) == 0: return
-    types = {sense.S_type} | nbar.types
-    sem = "%s, 'ns%d:type': '%s'," % (nbar.sem, unique_prefix,
-                                      sense.S_type)
-    unique_prefix += 1
-    for property in sense.path:
-        sem += " 'ns%d:%s': [{" % (unique_prefix, property)
-    unique_prefix += 1
-    sem += ' %s' % dp.sem
-    for property in sense.path:
-        sem += ' }]'
+    types = sense.S_types | nbar.types
+    # (Prefixed, in case the NBar already has these properties.)
+    path = path_sem(sense.path, sense.via, dp.sem, 'ns:')
+    sem = nbar.sem.plus(('ns:type', sense.S_type)).extend(path)
     reln=nbar.reln
     fit=comp_nbar * comp_dp * nbar.fit * dp.fit
     return TypedMeaning(types, sem, reln, fit)
 
+def path_sem(path, via, sem, prefix=''):
+    """Return the properties leading along a path of properties (and through
+    the things with any via properties, see PredicateSense) to sem, as a
+    Query.  The path's properties are given the prefix.
+    """
+    for index in reversed(range(len(path))):
+        sem = Query((prefix + path[index], sem))
+        if 0 < index <= len(via):
+            sem = sem.plus(*[(property, Query(('name', name)))
+                             for (property, name) in via[index - 1]])
+    return sem
+
+@interpretation
 def NBar(tree):
-    global unique_prefix
     results = []
     if len(tree) == 1 and tree[0].node == 'N': results = N(tree[0])
     elif tree[0].node == 'LBR': results = NBar(tree[1])
@@ -212,114 +404,34 @@ def NBar(tree):
     # --- NBar -> N NBar ---
     elif tree[0].node == 'N' and tree[1].node == 'NBar':
         (n_meanings, nbar_meanings) = (N(tree[0]), NBar(tree[1]))
-        for n in n_meanings:
-            # Modify the noun semantics by removing redundant 'name' and 'mid'
-            # fields and changing 'type' to 'ns5:type', where 'ns5' is a unique 
-            # identifier (in case we have 'politician woman author').
-            n.sem = re.sub(r"'name': null, ", '', n.sem)
-            n.sem = re.sub(r"'mid': null, ", '', n.sem)
-            n.sem = re.sub(r"'type':", "'ns" + str(unique_prefix) + ":type':",
-                           n.sem)
-            unique_prefix += 1
-            for nbar in nbar_meanings:
-                comp_n_nbar = compatible(n.types, nbar.types)
-                if comp_n_nbar > 0:
-                    results.append(TypedMeaning(types=n.types | nbar.types,
-                            sem=n.sem + ', ' + nbar.sem, reln=nbar.reln,
-                            fit=comp_n_nbar * nbar.fit))
+        n_meanings = [noun_modifier(n) for n in n_meanings]
+        results = combine(N_NBar, tree, n_meanings, nbar_meanings,
+                          right_fit)
 
     # --- NBar -> N OF DP ---
     elif tree[0].node == 'N' and tree[1].node == 'OF':
         (n_meanings, dp_meanings) = (N(tree[0]), DP(tree[2]))
-
-        for n in n_meanings:
-            for dp in dp_meanings:
-                if n.reln == 'author':
-                    comp_dp = compatible(dp.types, {'/book/written_work'})
-                    if comp_dp > 0:
-                        results.append(TypedMeaning(types=n.types,
-                                sem="'mid': null, 'name': null, '/book/author/works_written': [{ " + dp.sem + " }]",
-                                fit=comp_dp*dp.fit))
-                if n.reln == 'child':
-                    comp_dp = compatible(dp.types, {'/people/person'})
-                    if comp_dp > 0:
-                        results.append(TypedMeaning(types=n.types,
-                                sem="'mid': null, 'name': null, '!/people/person/children': [{ " + dp.sem + " }]",
-                                fit=comp_dp*dp.fit))
-                if n.reln == 'mayor':
-                    comp_dp = compatible(dp.types, {'/location/citytown'})
-                    if comp_dp > 0:
-                        results.append(TypedMeaning(types=n.types,
-                                sem="'mid': null, 'name': null, '!/government/government_position_held/office_holder': [{ '/government/government_position_held/jurisdiction_of_office': [{ " + dp.sem + " }], '/government/government_position_held/basic_title': [{ 'name': 'Mayor' }] }]",
-                                fit=comp_dp*dp.fit))
+        results = combine(N_OF_DP, tree, n_meanings, dp_meanings,
+                          right_fit)
 
     # --- NBar -> NBar P DP ---
     elif tree[0].node == 'NBar' and tree[1].node == 'P':
         (nbar_meanings, dp_meanings) = (NBar(tree[0]), DP(tree[2]))
+        # The DP meanings are all known already, so score them in one batch.
+        # NBar meanings are scored as they're worked out (see NBar_P_DP()).
+        word = tree[1][0]
+        score_senses(word, lexicon.pred_index.get(word, []), [], dp_meanings)
+        results = combine(NBar_P_DP, tree, nbar_meanings, dp_meanings)
 
         suggestions = []
-        for nbar in nbar_meanings:
-            for dp in dp_meanings:
-
-                # Add compatible interpretations from the predicate table.
-                for predicate in lexicon.pred_table.values():
-                    # Currently ignoring lexical category of predicate.
-                    lexical_items = [x[1] for x in predicate.lexicalizations]
-                    if tree[1][0] in lexical_items:
-                        for sense in predicate.senses:
-                            meaning = pred_meaning(sense, nbar, dp)
-                            if meaning: results.append(meaning)
-
-                if tree[1][0].lower() == 'rel':
-                    meanings = []
-                    for predicate in lexicon.pred_table.values():
-                        for sense in predicate.senses:
-                            meaning = pred_meaning(sense, nbar, dp)
-                            if meaning:
-                                meanings.append((meaning, sense,
-                                        predicate.lexicalizations))
-                    # # Sort list of meaning/sense/lexes tuples by meaning.fit
-                    # meanings = sorted(meanings, key=lambda x: x[0].fit,
-                    #                   reverse=True)
-                    for (meaning, sense, lexes) in meanings:
-                        S_type = lexicon.type_table[sense.S_type]
-                        O_type = lexicon.type_table[sense.O_type]
-                        # Rate relations involving 'topic' as slightly worse.
-                        if S_type == 'topic' or O_type == 'topic':
-                            meaning.fit *= 0.99
-                        suggestions.append(
-                                (meaning.fit, S_type, lexes[0][1], O_type))
-
-                if tree[1][0] == 'with':
-                    if dp.reln == 'author':
-                        comp_nbar = compatible(nbar.types,
-                                {'/book/written_work'})
-                        comp_dp = compatible(dp.types, {'/book/author'})
-                        if min(comp_nbar, comp_dp) > 0:
-                            results.append(TypedMeaning(
-                                    types={'/book/written_work'} | nbar.types,
-                                    sem=nbar.sem + ", '/book/written_work/author': [{ " + dp.sem + " }]", reln=nbar.reln,
-                                    fit=comp_nbar*comp_dp*nbar.fit*dp.fit))
-                    if dp.reln == 'child':
-                        comp_nbar = compatible(nbar.types, {'/people/person'})
-                        comp_dp = compatible(dp.types, {'/people/person'})
-                        if min(comp_nbar, comp_dp) > 0:
-                            results.append(TypedMeaning(
-                                    types={'/people/person'} | nbar.types,
-                                    sem=nbar.sem + ", '/people/person/children': [{ " + dp.sem + " }]",
-                                    reln=nbar.reln,
-                                    fit=comp_nbar*comp_dp*nbar.fit*dp.fit))
-                    if dp.reln == 'mayor':
-                        comp_nbar = compatible(nbar.types,
-                                {'/location/citytown'})
-                        comp_dp = compatible(dp.types,
-                                {'/government/politician'})
-                        if min(comp_nbar, comp_dp) > 0:
-                            results.append(TypedMeaning(
-                                    types={'/location/citytown'} | nbar.types,
-                                    sem=nbar.sem + ", '!/government/government_position_held/jurisdiction_of_office': [{ '/government/government_position_held/office_holder': [{ " + dp.sem + " }], '/government/government_position_held/basic_title': [{ 'name': 'Mayor' }] }]",
-                                    reln=nbar.reln,
-                                    fit=comp_nbar*comp_dp*nbar.fit*dp.fit))
+        if word.lower() == 'rel':
+            # Suggestions are printed now, so work them all out.
+            nbar_meanings = [meaning for (_, _, meaning)
+                             in lazy(nbar_meanings).items()]
+            score_senses(None, [sense for (sense, lexes) in all_senses],
+                         nbar_meanings, dp_meanings)
+            suggestions = combine_all(rel_suggestions, tree, nbar_meanings,
+                                      dp_meanings)
 
         # If suggestions were generated, print the best N of them.
         # Skip repeated suggestions.
@@ -351,344 +463,176 @@ def NBar(tree):
 
     return results
 
-def A(tree):
-
+def score_senses(key, senses, nbar_meanings, dp_meanings):
+    """For NBar -> NBar P DP, work out how compatible each NBar meaning is
+    with the subject type of each of the P's senses, and each DP meaning with
+    the object types, in one batch (see compatible_many()) rather than sense by
+    sense.  Saves lists of fits, parallel to senses, in sense_fits under
+    (types, key, 'S') for NBar types and (types, key, 'O') for DP types.
+    The key is the P, or None for all_senses.
+    """
+    if not senses: return
+    todo = []
+    for (meanings, role) in ((nbar_meanings, 'S'), (dp_meanings, 'O')):
+        for types in set(meaning.types for meaning in meanings):
+            if (types, key, role) not in sense_fits: todo.append((types, role))
+    if not todo: return
+    batch = []
+    for (types, role) in todo:
+        if role == 'S': batch += [(types, sense.S_types) for sense in senses]
+        else: batch += [(types, sense.O_types) for sense in senses]
+    fits = compatible_many(batch)
+    for (index, (types, role)) in enumerate(todo):
+        sense_fits[(types, key, role)] = \
+                fits[index * len(senses):(index + 1) * len(senses)]
+
+def noun_modifier(n):
+    """Return a copy of a noun meaning for use as a modifier in NBar -> N
+    NBar, the same copy every time for the same meaning.
+    """
+    if (noun_modifier, n) not in pairs:
+        # Modify the noun semantics by removing redundant 'name' and 'mid'
+        # fields and changing 'type' to 'ns:type', which gets a unique
+        # namespace prefix (in case we have 'politician woman author').
+        sem = n.sem.without(('name', None), ('mid', None))
+        sem = sem.renamed('type', 'ns:type')
+        pairs[(noun_modifier, n)] = TypedMeaning(types=n.types, sem=sem,
+                                                 reln=n.reln, fit=n.fit)
+    return pairs[(noun_modifier, n)]
+
+def N_NBar(tree, n, nbar):
+    """Interpret NBar -> N NBar for one meaning each of the N (as returned by
+    noun_modifier()) and the NBar.
+    """
     results = []
+    comp_n_nbar = compatible(n.types, nbar.types)
+    if comp_n_nbar > 0:
+        results.append(TypedMeaning(types=n.types | nbar.types,
+                sem=n.sem.extend(nbar.sem), reln=nbar.reln,
+                fit=comp_n_nbar * nbar.fit))
+    return results
 
-    if tree[0] == 'Mexican': results.append(TypedMeaning(
-            types={'/dining/cuisine'}, sem="'mid': '/m/051zk'"))
-    if tree[0] == 'female': results.append(TypedMeaning(
-            types={'/people/gender'}, sem="'mid': '/m/02zsn'"))
-    if tree[0] == 'male': results.append(TypedMeaning(
-            types={'/people/gender'}, sem="'mid': '/m/05zppz'"))
+def N_OF_DP(tree, n, dp):
+    """Interpret NBar -> N OF DP for one meaning each of the N and the DP,
+    using the senses in lexicon.RelN_table of the N's relation (if any).
+    """
+    results = []
+    for sense in lexicon.RelN_table.get(n.reln, []):
+        comp_dp = compatible(dp.types, sense.O_types)
+        if comp_dp > 0:
+            results.append(TypedMeaning(types=n.types,
+                    sem=Query(('mid', None), ('name', None)).extend(
+                            path_sem(sense.path, sense.via, dp.sem)),
+                    fit=comp_dp*dp.fit))
+    return results
 
-    # =========================================================================
-    # Insert Auto-Generated Adj Interpretation Rules Here
-    # =========================================================================
+def NBar_P_DP(tree, nbar, dp):
+    """Interpret NBar -> NBar P DP for one meaning each of the NBar and the
+    DP.
+    """
+    results = []
+    # Add compatible interpretations from the predicate table.
+    # Currently ignoring lexical category of predicate.
+    word = tree[1][0]
+    senses = lexicon.pred_index.get(word, [])
+    if senses:
+        score_senses(word, senses, [nbar], [dp])
+        senses = zip(senses, sense_fits[(nbar.types, word, 'S')],
+                     sense_fits[(dp.types, word, 'O')])
+    for (sense, comp_nbar, comp_dp) in senses:
+        meaning = pred_meaning(sense, nbar, dp, comp_nbar, comp_dp)
+        if meaning: results.append(meaning)
+
+    # NBar with (a) relational noun DP, e.g. 'books with author X', using the
+    # inverses of the relational noun's senses.
+    if tree[1][0] == 'with':
+        for sense in lexicon.RelN_table.get(dp.reln, []):
+            sense = sense.inverse
+            meaning = pred_meaning(sense, nbar, dp,
+                                   compatible(nbar.types, sense.S_types),
+                                   compatible(dp.types, sense.O_types))
+            if meaning: results.append(meaning)
+    return results
 
-    # ===== Automated A() Interpretation Rules for Countries =====
-    if tree[0] in {'American'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/09c7w0'"))
-    if tree[0] in {'German'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0345h'"))
-    if tree[0] in {'Australian', 'Aussie'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0chghy'"))
-    if tree[0] in {'Iranian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03shp'"))
-    if tree[0] in {'British'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07ssc'"))
-    if tree[0] in {'Hongkongese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03h64'"))
-    if tree[0] in {'Icelander'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03rj0'"))
-    if tree[0] in {'French'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0f8l9c'"))
-    if tree[0] in {'Indian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03rk0'"))
-    if tree[0] in {'Canadian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0d060g'"))
-    if tree[0] in {'Russian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06bnz'"))
-    if tree[0] in {'Japanese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03_3d'"))
-    if tree[0] in {'Italian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03rjj'"))
-    if tree[0] in {'Filipino'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05v8c'"))
-    if tree[0] in {'South African'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0hzlz'"))
-    if tree[0] in {'Thai'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07f1x'"))
-    if tree[0] in {'Polish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05qhw'"))
-    if tree[0] in {'English'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02jx1'"))
-    if tree[0] in {'Irish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03rt9'"))
-    if tree[0] in {'Brazilian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/015fr'"))
-    if tree[0] in {'Argentine', 'Argentinean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0jgd'"))
-    if tree[0] in {'Belgian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0154j'"))
-    if tree[0] in {'Netherlander', 'Hollander', 'Dutch'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/059j2'"))
-    if tree[0] in {'Dane', 'Danish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0k6nt'"))
-    if tree[0] in {'Swede', 'Swedish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0d0vqn'"))
-    if tree[0] in {'Turk', 'Turkish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01znc_'"))
-    if tree[0] in {'Venezuelan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07ylj'"))
-    if tree[0] in {'North Korean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05b7q'"))
-    if tree[0] in {'South Korean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06qd3'"))
-    if tree[0] in {'Mexican'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0b90_r'"))
-    if tree[0] in {'Czechoslovakian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01mk6'"))
-    if tree[0] in {'Russian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0cdbq'"))
-    if tree[0] in {'Kiwi', 'New Zealand'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0ctw_b'"))
-    if tree[0] in {'Lithuanian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04gzd'"))
-    if tree[0] in {'Spaniard', 'Spanish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06mkj'"))
-    if tree[0] in {'West German'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/082fr'"))
-    if tree[0] in {'Singaporean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06t2t'"))
-    if tree[0] in {'Norwegian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05b4w'"))
-    if tree[0] in {'Czech'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01mjq'"))
-    if tree[0] in {'Croat', 'Croatian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01pj7'"))
-    if tree[0] in {'Slovak', 'Slovakian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06npd'"))
-    if tree[0] in {'Moroccan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04wgh'"))
-    if tree[0] in {'Luxembourger'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04g61'"))
-    if tree[0] in {'Pakistani'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05sb1'"))
-    if tree[0] in {'Finn', 'Finnish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02vzc'"))
-    if tree[0] in {'Swiss'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06mzp'"))
-    if tree[0] in {'Motswana', 'Batswana'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0166v'"))
-    if tree[0] in {'Malaysian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/09pmkv'"))
-    if tree[0] in {'Egyptian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02k54'"))
-    if tree[0] in {'Hungarian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03gj2'"))
-    if tree[0] in {'Andorran'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0hg5'"))
-    if tree[0] in {'Emirian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0j1z8'"))
-    if tree[0] in {'Afghan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0jdd'"))
-    if tree[0] in {'Albanian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0jdx'"))
-    if tree[0] in {'Armenian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0jgx'"))
-    if tree[0] in {'Angolan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0j4b'"))
-    if tree[0] in {'Austrian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0h7x'"))
-    if tree[0] in {'Aruban'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0j11'"))
-    if tree[0] in {'Azerbaijani'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0jhd'"))
-    if tree[0] in {'Bosnian', 'Herzegovinian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0166b'"))
-    if tree[0] in {'Barbadian', 'Bajun'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0162v'"))
-    if tree[0] in {'Bangladeshi'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0162b'"))
-    if tree[0] in {'Burkinabe', 'Burkinab'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01699'"))
-    if tree[0] in {'Bulgarian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/015qh'"))
-    if tree[0] in {'Bahraini'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0161c'"))
-    if tree[0] in {'Burundian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0169t'"))
-    if tree[0] in {'Beninese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0164v'"))
-    if tree[0] in {'Bermudan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0165b'"))
-    if tree[0] in {'Bruneian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0167v'"))
-    if tree[0] in {'Bolivian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0165v'"))
-    if tree[0] in {'Bahaman'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0160w'"))
-    if tree[0] in {'Bhutanese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07bxhl'"))
-    if tree[0] in {'Belarusian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0163v'"))
-    if tree[0] in {'Belizean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0164b'"))
-    if tree[0] in {'Central African'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01nyl'"))
-    if tree[0] in {'Congolese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01rxw'"))
-    if tree[0] in {'Ivorian', 'Ivoirian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0fv4v'"))
-    if tree[0] in {'Chilean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01p1v'"))
-    if tree[0] in {'Cameroonian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01nln'"))
-    if tree[0] in {'Chinese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0d05w3'"))
-    if tree[0] in {'Colombian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01ls2'"))
-    if tree[0] in {'Costa Rican'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01p8s'"))
-    if tree[0] in {'Serbian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/077qn'"))
-    if tree[0] in {'Cuban'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0d04z6'"))
-    if tree[0] in {'Cape Verdean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01nqj'"))
-    if tree[0] in {'Cypriot'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01ppq'"))
-    if tree[0] in {'Djibouti'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/027jk'"))
-    if tree[0] in {'Dominican'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/027nb'"))
-    if tree[0] in {'Dominican'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/027rn'"))
-    if tree[0] in {'Algerian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0h3y'"))
-    if tree[0] in {'Ecuadorean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02k1b'"))
-    if tree[0] in {'Estonian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02kmm'"))
-    if tree[0] in {'Eritrean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02khs'"))
-    if tree[0] in {'Ethiopian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/019pcs'"))
-    if tree[0] in {'Fijian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02wt0'"))
-    if tree[0] in {'Grenadian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/035yg'"))
-    if tree[0] in {'Georgian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0d0kn'"))
-    if tree[0] in {'Ghanaian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/035dk'"))
-    if tree[0] in {'Gambian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0hdx8'"))
-    if tree[0] in {'Guinean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03676'"))
-    if tree[0] in {'Guadeloupean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/037nm'"))
-    if tree[0] in {'Equatorial Guinean', 'Equatoguinean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02kcz'"))
-    if tree[0] in {'Greek'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/035qy'"))
-    if tree[0] in {'Guatemalan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0345_'"))
-    if tree[0] in {'Guamanian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/034tl'"))
-    if tree[0] in {'Guinea-Bissauan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/036b_'"))
-    if tree[0] in {'Guyanese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/034m8'"))
-    if tree[0] in {'Honduran'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03h2c'"))
-    if tree[0] in {'Haitian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03gyl'"))
-    if tree[0] in {'Indonesian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03ryn'"))
-    if tree[0] in {'Israeli'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03spz'"))
-    if tree[0] in {'Iraqi'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0d05q4'"))
-    if tree[0] in {'Jamaican'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03_r3'"))
-    if tree[0] in {'Jordanian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03__y'"))
-    if tree[0] in {'Kenyan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/019rg5'"))
-    if tree[0] in {'Cambodian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01xbgx'"))
-    if tree[0] in {'I-Kiribati'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/047t_'"))
-    if tree[0] in {'Comoran'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01n6c'"))
-    if tree[0] in {'Kittian', 'Nevisian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06ryl'"))
-    if tree[0] in {'Kuwaiti'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/047yc'"))
-    if tree[0] in {'Kazakhstani'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/047lj'"))
-    if tree[0] in {'Lao', 'Laotian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04hhv'"))
-    if tree[0] in {'Lebanese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04hqz'"))
-    if tree[0] in {'Saint Lucian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06s0l'"))
-    if tree[0] in {'Liechtensteiner'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04j53'"))
-    if tree[0] in {'Sri Lankan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06m_5'"))
-    if tree[0] in {'Liberian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04hzj'"))
-    if tree[0] in {'Mosotho', 'Basotho'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04hvw'"))
-    if tree[0] in {'Latvian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04g5k'"))
-    if tree[0] in {'Libyan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04gqr'"))
-    if tree[0] in {'Monegasque', 'Monacan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04w58'"))
-    if tree[0] in {'Moldovan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04w4s'"))
-    if tree[0] in {'Malagasy'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04sj3'"))
-    if tree[0] in {'Marshallese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04v6v'"))
-    if tree[0] in {'Macedonian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0bjv6'"))
-    if tree[0] in {'Malian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04v09'"))
-    if tree[0] in {'Mongolian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04w8f'"))
-    if tree[0] in {'Mauritanian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04vjh'"))
-    if tree[0] in {'Maltese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04v3q'"))
-    if tree[0] in {'Mauritian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04vs9'"))
-    if tree[0] in {'Maldivan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04ty8'"))
-    if tree[0] in {'Malawian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04tr1'"))
-    if tree[0] in {'Mozambican'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04wlh'"))
-    if tree[0] in {'Namibian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05bmq'"))
-    if tree[0] in {'Nigerien'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05cc1'"))
-    if tree[0] in {'Nigerian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05cgv'"))
-    if tree[0] in {'Nicaraguan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05c74'"))
-    if tree[0] in {'Nepalese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/016zwt'"))
-    if tree[0] in {'Nauruan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05br2'"))
-    if tree[0] in {'Omani'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05l8y'"))
-    if tree[0] in {'Panamanian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05qx1'"))
-    if tree[0] in {'Peruvian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/016wzw'"))
-    if tree[0] in {'French Polynesian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02wzv'"))
-    if tree[0] in {'Papua New Guinean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05qkp'"))
-    if tree[0] in {'Puerto Rican'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05r7t'"))
-    if tree[0] in {'Portuguese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05r4w'"))
-    if tree[0] in {'Paraguayan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05v10'"))
-    if tree[0] in {'Qatari'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0697s'"))
-    if tree[0] in {'Romanian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06c1y'"))
-    if tree[0] in {'Rwandan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06dfg'"))
-    if tree[0] in {'Saudi', 'Saudi Arabian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01z215'"))
-    if tree[0] in {'Solomon Islander'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01n8qg'"))
-    if tree[0] in {'Seychellois'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06sw9'"))
-    if tree[0] in {'Sudanese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06tw8'"))
-    if tree[0] in {'Slovene', 'Slovenian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06t8v'"))
-    if tree[0] in {'Sierra Leonean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06s_2'"))
-    if tree[0] in {'Sammarinese', 'San Marinese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06sff'"))
-    if tree[0] in {'Senegalese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06srk'"))
-    if tree[0] in {'Somali'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06tgw'"))
-    if tree[0] in {'Surinamer'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06nnj'"))
-    if tree[0] in {'Salvadoran'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02k8k'"))
-    if tree[0] in {'Syrian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06vbd'"))
-    if tree[0] in {'Swazi'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06v36'"))
-    if tree[0] in {'Chadian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01p1b'"))
-    if tree[0] in {'Togolese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07f5x'"))
-    if tree[0] in {'Tajik', 'Tadzhik'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07dvs'"))
-    if tree[0] in {'Turkmen(s)'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01c4pv'"))
-    if tree[0] in {'Tunisian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07fj_'"))
-    if tree[0] in {'Tongan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07fb6'"))
-    if tree[0] in {'Trinidadian', 'Tobagonian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/09lxtg'"))
-    if tree[0] in {'Tuvaluan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07fsv'"))
-    if tree[0] in {'Tanzanian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07dzf'"))
-    if tree[0] in {'Ukrainian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07t21'"))
-    if tree[0] in {'Ugandan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07tp2'"))
-    if tree[0] in {'Uruguayan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07twz'"))
-    if tree[0] in {'Uzbek', 'Uzbekistani'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07t_x'"))
-    if tree[0] in {'none'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07ytt'"))
-    if tree[0] in {'Vietnamese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01crd5'"))
-    if tree[0] in {'Ni-Vanuatu'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/07z5n'"))
-    if tree[0] in {'Yemeni', 'Yemenite'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01z88t'"))
-    if tree[0] in {'Zambian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/088vb'"))
-    if tree[0] in {'Zimbabwean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/088q4'"))
-    if tree[0] in {'Burmese', 'Myanmarese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/04xn_'"))
-    if tree[0] in {'Montenegrin'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/056vv'"))
-    if tree[0] in {'Palauan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05tr7'"))
-    if tree[0] in {'Northern Irish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05bcl'"))
-    if tree[0] in {'Scottish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06q1r'"))
-    if tree[0] in {'Welsh'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0j5g9'"))
-    if tree[0] in {'Samoan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06s9y'"))
-    if tree[0] in {'Congolese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/088xp'"))
-    if tree[0] in {'East Timorese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02lx0'"))
-    if tree[0] in {'Yugoslavian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/087vz'"))
-    if tree[0] in {'Dutch'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/049nq'"))
-    if tree[0] in {'Gabonese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03548'"))
-    if tree[0] in {'Spartan'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/09472'"))
-    if tree[0] in {'Palestinian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0604m'"))
-    if tree[0] in {'Palestinian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0h44w'"))
-    if tree[0] in {'Taiwanese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06f32'"))
-    if tree[0] in {'Hungarian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03l5m1'"))
-    if tree[0] in {'Roman'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03gk2'"))
-    if tree[0] in {'British'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/014tss'"))
-    if tree[0] in {'Macedonian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0bk25'"))
-    if tree[0] in {'English'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/024pcx'"))
-    if tree[0] in {'Roman'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06cmp'"))
-    if tree[0] in {'Ottoman'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05kyr'"))
-    if tree[0] in {'South African'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0c4b8'"))
-    if tree[0] in {'New Guinean'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/09wfqp'"))
-    if tree[0] in {'Rhodesian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06jnv'"))
-    if tree[0] in {'Roman'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06frc'"))
-    if tree[0] in {'Polish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03pn9'"))
-    if tree[0] in {'French'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0gtzp'"))
-    if tree[0] in {'Yugoslavian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/018j0w'"))
-    if tree[0] in {'Italian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05jt5h'"))
-    if tree[0] in {'Irish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/016jz3'"))
-    if tree[0] in {'Western Roman'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02jbz2'"))
-    if tree[0] in {'Spanish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01s47p'"))
-    if tree[0] in {'Bohemian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0410vqb'"))
-    if tree[0] in {'Mongolian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01jv68'"))
-    if tree[0] in {'Rhodesian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01ptlk'"))
-    if tree[0] in {'German'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03b79'"))
-    if tree[0] in {'Aragonian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02srrt'"))
-    if tree[0] in {'Athenian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03nmzqx'"))
-    if tree[0] in {'Albanian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06857n'"))
-    if tree[0] in {'Hawaiian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/019kzh'"))
-    if tree[0] in {'Czechoslovakian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05yt6l'"))
-    if tree[0] in {'Prussian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01k6y1'"))
-    if tree[0] in {'Confederate'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/020d5'"))
-    if tree[0] in {'Romanian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01rdm0'"))
-    if tree[0] in {'Serbian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06swt'"))
-    if tree[0] in {'Palestinian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0nyg5'"))
-    if tree[0] in {'Austrasia'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0gytv'"))
-    if tree[0] in {'Sicilian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02zqdb'"))
-    if tree[0] in {'Soviet'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05vz3zq'"))
-    if tree[0] in {'Byzantine'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/017cw'"))
-    if tree[0] in {'Iraqi'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02p717m'"))
-    if tree[0] in {'Austrian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01nhhz'"))
-    if tree[0] in {'Soviet'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01mzwp'"))
-    if tree[0] in {'Italian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02psqkz'"))
-    if tree[0] in {'German'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01qlyt'"))
-    if tree[0] in {'Japanese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0193qj'"))
-    if tree[0] in {'Bulgarian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03bxbql'"))
-    if tree[0] in {'Hawaiian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01hlvc'"))
-    if tree[0] in {'Hungarian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02rnb5c'"))
-    if tree[0] in {'French'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01flgk'"))
-    if tree[0] in {'Swedish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01fvhp'"))
-    if tree[0] in {'Chechen'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0dfrl8'"))
-    if tree[0] in {'Dutch'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0dv0z'"))
-    if tree[0] in {'Welsh'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0576g9'"))
-    if tree[0] in {'Bavarian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02vkbz_'"))
-    if tree[0] in {'Emirian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0c75f'"))
-    if tree[0] in {'French'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0152tq'"))
-    if tree[0] in {'Serbian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/025scy1'"))
-    if tree[0] in {'Yugoslavian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01hs96'"))
-    if tree[0] in {'Serbian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0821k6'"))
-    if tree[0] in {'Greek'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/088q1s'"))
-    if tree[0] in {'Babylonian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0cn3b'"))
-    if tree[0] in {'Sicilian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0bd46l'"))
-    if tree[0] in {'Brazilian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01nr2h'"))
-    if tree[0] in {'Zairian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0k5vl'"))
-    if tree[0] in {'French'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0cn_tpv'"))
-    if tree[0] in {'South Sudanese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/05rznz'"))
-    if tree[0] in {'Zulu'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/03gwrmk'"))
-    if tree[0] in {'Croatian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/025scyf'"))
-    if tree[0] in {'Portuguese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0285m87'"))
-    if tree[0] in {'French'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01fmy9'"))
-    if tree[0] in {'Roman'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/06gb8'"))
-    if tree[0] in {'English'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0210n'"))
-    if tree[0] in {'Burmese'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/027g22f'"))
-    if tree[0] in {'Polish'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/02z1d_'"))
-    if tree[0] in {'Kirghiz', 'Kyrgyz'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/0jt3tjf'"))
-    if tree[0] in {'Palestinian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01k0p4'"))
-    if tree[0] in {'Prussian'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/020g9r'"))
-    if tree[0] in {'Saxon'}: results.append(TypedMeaning(types={'/location/country'}, sem="'name': null, 'mid': '/m/01n45v'"))
+def rel_suggestions(tree, nbar, dp):
+    """For NBar -> NBar 'rel' DP, return (fit, subject type, relation, object
+    type) suggestions for one meaning each of the NBar and the DP.
+    """
+    results = []
+    meanings = []
+    senses = zip(all_senses, sense_fits[(nbar.types, None, 'S')],
+                 sense_fits[(dp.types, None, 'O')])
+    for ((sense, lexicalizations), comp_nbar, comp_dp) in senses:
+        meaning = pred_meaning(sense, nbar, dp, comp_nbar, comp_dp)
+        if meaning:
+            meanings.append((meaning, sense, lexicalizations))
+    # # Sort list of meaning/sense/lexes tuples by meaning.fit
+    # meanings = sorted(meanings, key=lambda x: x[0].fit,
+    #                   reverse=True)
+    for (meaning, sense, lexes) in meanings:
+        S_type = lexicon.type_table[sense.S_type]
+        O_type = lexicon.type_table[sense.O_type]
+        # Rate relations involving 'topic' as slightly worse.
+        if S_type == 'topic' or O_type == 'topic':
+            meaning.fit *= 0.99
+        results.append(
+                (meaning.fit, S_type, lexes[0][1], O_type))
+    return results
 
-    # =========================================================================
-    # End Auto-Generated Adj Interpretation Rules
-    # =========================================================================
+# The meanings of each adjective in lexicon.A_table, made once.  Adjectives
+# denote one thing each (a country, ethnicity, gender or cuisine), and
+# lexicon.A_rel_table says how NPs can be modified by things of each type.
+A_meanings = dict((adj, [TypedMeaning(types=type_set(type),
+                                      sem=Query(('name', None), ('mid', mid)))
+                         for (type, mid) in senses])
+                  for (adj, senses) in lexicon.A_table.items())
 
-    return results
+@interpretation
+def A(tree):
+    return list(A_meanings.get(tree[0], []))
 
+@interpretation
 def N(tree):
     results = []
 
     # Add all interpretations from the noun table.
     if tree[0] in lexicon.N_table:
         for sense in lexicon.N_table[tree[0]]:
-            sem = "'mid': null, 'name': null, 'type': '%s'" % sense
-            results.append(TypedMeaning(types={sense}, sem=sem))
+            sem = Query(('mid', None), ('name', None), ('type', sense))
+            results.append(TypedMeaning(types=type_set(sense), sem=sem))
         if not lexicon.N_table[tree[0]]:
-            sem = "'mid': null, 'name': null"
-            results.append(TypedMeaning(types=set(), sem=sem))
+            sem = Query(('mid', None), ('name', None))
+            results.append(TypedMeaning(types=type_set(), sem=sem))
 
     # Add handwritten noun rules.
     # (Eventually put these into the noun table in a separate module.)
     if tree[0] in {'author', 'authors'}: results.append(TypedMeaning(
-            types={'/book/author'},
-            sem="'mid': null, 'name': null, 'type': '/book/author'",
+            types=type_set('/book/author'),
+            sem=Query(('mid', None), ('name', None), ('type', '/book/author')),
             reln='author'))
     if tree[0] in {'child', 'children', 'kid', 'kids'}:
-        results.append(TypedMeaning(types={'/people/person'},
-                sem="'mid': null, 'name': null", reln='child'))
+        results.append(TypedMeaning(types=type_set('/people/person'),
+                sem=Query(('mid', None), ('name', None)), reln='child'))
     if tree[0] in {'man', 'men'}: results.append(TypedMeaning(
-            types={'/people/person'},
-            sem="'mid': null, 'name': null, 'type': '/people/person', '/people/person/gender': [{ 'mid': '/m/05zppz' }]"))
+            types=type_set('/people/person'),
+            sem=Query(('mid', None), ('name', None),
+                      ('type', '/people/person'),
+                      ('/people/person/gender', Query(('mid', '/m/05zppz'))))))
     if tree[0] in {'mayor', 'mayors'}: results.append(TypedMeaning(
-            types={'/government/politician'},
-            sem="'mid': null, 'name': null, '!/government/government_position_held/office_holder': [{ '/government/government_position_held/jurisdiction_of_office': [{ 'name': null, 'mid': null }], '/government/government_position_held/basic_title': [{ 'name': 'Mayor' }] }]",
+            types=type_set('/government/politician'),
+            sem=Query(('mid', None), ('name', None),
+                      ('!/government/government_position_held/office_holder', Query(
+                          ('/government/government_position_held/jurisdiction_of_office', Query(('name', None), ('mid', None))),
+                          ('/government/government_position_held/basic_title', Query(('name', 'Mayor')))))),
             reln='mayor'))
     if tree[0] in {'novel', 'novels'}: results.append(TypedMeaning(
-            types={'/book/book'},
-            sem="'mid': null, 'name': null, 'type': '/book/book', '/book/book/genre': [{ 'mid': '/m/05hgj' }]"))
+            types=type_set('/book/book'),
+            sem=Query(('mid', None), ('name', None), ('type', '/book/book'),
+                      ('/book/book/genre', Query(('mid', '/m/05hgj'))))))
     if tree[0] in {'woman', 'women'}: results.append(TypedMeaning(
-            types={'/people/person'}, sem="'mid': null, 'name': null, 'type': '/people/person', '/people/person/gender': [{ 'mid': '/m/02zsn' }]"))
+            types=type_set('/people/person'),
+            sem=Query(('mid', None), ('name', None),
+                      ('type', '/people/person'),
+                      ('/people/person/gender', Query(('mid', '/m/02zsn'))))))
 
     return results
@@ -0,0 +1,43 @@
+"""Find the lexicon words, including multiwords (e.g. 'musical recording'), in
+a query.
+
+A query's words can often be grouped into lexicon words in more than one way:
+'musical recording artist' is 'musical recording' + 'artist', or 'musical' +
+'recording artist'.  Rather than picking one grouping, lattice() returns every
+lexicon word found at every position, and the parser chooses among them.  (The
+grammar spells multiwords as sequences of terminals, so the parser sees the
+query one word at a time.)
+
+The words are stored in a trie of single words, built once, so each position
+is matched by walking the trie rather than by joining and looking up every
+possible multiword.
+"""
+
+from grammar_words import words as grammar_words
+
+# Trie key marking the end of a (multi)word.  Its value is the (multi)word.
+END = None
+
+def build_trie(words):
+    """Return a trie of nested dicts, one level per word of each multiword."""
+    trie = {}
+    for word in words:
+        node = trie
+        for part in word.split(): node = node.setdefault(part, {})
+        node[END] = word
+    return trie
+
+trie = build_trie(grammar_words)
+
+def lattice(tokens, trie=trie):
+    """Return (start, end, word) for every lexicon (multi)word that matches
+    tokens[start:end], in order of start and then end.
+    """
+    edges = []
+    for start in range(len(tokens)):
+        node = trie
+        for end in range(start, len(tokens)):
+            node = node.get(tokens[end])
+            if node is None: break
+            if END in node: edges.append((start, end + 1, node[END]))
+    return edges
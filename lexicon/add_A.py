@@ -7,4 +7,11 @@ existing adjectives, or entirely new adjectives.
 #   E.g. Japanese N ==> N from Japan
 
 def add_to(a_table):
-    pass
+
+    def add(adj, type, mid):
+        if adj not in a_table: a_table[adj] = []
+        if (type, mid) not in a_table[adj]: a_table[adj].append((type, mid))
+
+    add('female', '/people/gender', '/m/02zsn')
+    add('male', '/people/gender', '/m/05zppz')
+    add('Mexican', '/dining/cuisine', '/m/051zk')
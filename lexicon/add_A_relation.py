@@ -0,0 +1,26 @@
+"""Add entries to an adjective relation table, which says how an adjective
+can modify a noun phrase: NP -> A NP means an NP of the head type whose
+property has the A as its value.  The table maps each adjective type onto a
+list of (head type, property) relations.
+"""
+
+def add_to(a_rel_table):
+
+    def add(adj_type, head_type, property):
+        if adj_type not in a_rel_table: a_rel_table[adj_type] = []
+        a_rel_table[adj_type].append((head_type, property))
+
+    # Restaurant NP has cuisine-type A.
+    add('/dining/cuisine', '/dining/restaurant',
+        '/dining/restaurant/cuisine')
+    # Person NP has nationality A.
+    add('/location/country', '/people/person',
+        '/people/person/nationality')
+    # Person NP has ethnicity A.
+    add('/people/ethnicity', '/people/person', '/people/person/ethnicity')
+    # Person NP has gender A.
+    add('/people/gender', '/people/person', '/people/person/gender')
+    # Fictional character NP has (fictional) gender A.
+    add('/fictional_universe/character_gender',
+        '/fictional_universe/fictional_character',
+        '/fictional_universe/fictional_character/gender')
@@ -0,0 +1,33 @@
+"""Add entries to a relational noun table, mapping the relation key of each
+relational noun (the reln of its meanings in interpret.N()) onto a list of
+RelNSenses.  Only the path from the noun to its object is given here; the
+path back is worked out from it (see RelNSense).
+"""
+
+from predicate_table import *
+
+def add_to(reln_table):
+
+    def add_sense(key, reln_type, O_type, path, via=()):
+        if key not in reln_table: reln_table[key] = []
+        reln_table[key].append(RelNSense(reln_type, O_type, path, via))
+
+    # Author of a written work.
+    add_sense('author',
+            '/book/author',
+            '/book/written_work',
+            ['/book/author/works_written'])
+    # Child of a person.
+    add_sense('child',
+            '/people/person',
+            '/people/person',
+            ['!/people/person/children'])
+    # Mayor of a city, i.e. the office holder of a government position with
+    # the city as its jurisdiction and 'Mayor' as its title.
+    add_sense('mayor',
+            '/government/politician',
+            '/location/citytown',
+            ['!/government/government_position_held/office_holder',
+             '/government/government_position_held/jurisdiction_of_office'],
+            [[('/government/government_position_held/basic_title',
+               'Mayor')]])
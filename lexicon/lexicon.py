@@ -4,9 +4,13 @@
    the type restriction it imposes, its semantics, whether it can be used as
    a relational noun, and what its relational meaning is.  Others tables like
    prop_table and type_table go the other direction, mapping properties or
-   types onto words that can describe them.
+   types onto words that can describe them.  A_rel_table maps the type of an
+   adjective's meaning onto the ways it can modify a noun phrase, and
+   RelN_table maps the relation key of a relational noun (see interpret.N())
+   onto its RelNSenses.
 
-    N_table, A_table, pred_table, prop_table, type_table
+    N_table, A_table, A_rel_table, pred_table, RelN_table, prop_table,
+    type_table
 
 (1) Populate each table with the automatically generated rules given in the
     corresponding rules file (e.g. rules_N.py)
@@ -18,80 +22,178 @@
 (3) Add additional handwritten entries.  These are either adding new words, or
     new senses of existing words.  The new entries are stored in separate files
     (e.g. add_N.py).
+
+Building the tables is slow, so the finished tables are saved to a snapshot
+file, which later imports load in a single read.  The snapshot is keyed on a
+hash of the source files below, so it's rebuilt automatically whenever any of
+them changes.
 """
 
+import os
+import sys
+import glob
+import hashlib
+import cPickle
+
 from predicate_table import *
 
-from auto_rules_N import table as auto_N
-from auto_rules_A_country import table as auto_A_country
-from auto_rules_predicate import table as auto_predicate
-from auto_rules_property import table as auto_property
-from auto_rules_type import table as auto_type
+# --- Snapshot ---
+# Bump SNAPSHOT_VERSION when the layout of the tables changes in a way that
+# isn't visible in the source files.
+SNAPSHOT_VERSION = 2
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_PATH = os.path.join(DIRECTORY, 'lexicon.snapshot')
+SOURCE_PATTERNS = ('lexicon.py', 'predicate_table.py',
+                   'translate_metaschema.py', 'auto_rules_*.py', 'add_*.py')
 
-from translate_metaschema import translate_metaschema
 
-import add_N
-import add_A
-import add_predicate
+# =============================================================================
+# Initialize the lexicon.
+# =============================================================================
 
-# --- Lexicon ---
-(N_table, A_table, pred_table, prop_table, type_table) = ({}, {}, {}, {}, {})
+def optional_table(module):
+    """Return the table of an auto-generated rules module, or an empty table
+    (with a warning) if it hasn't been fetched yet (see fetch_lexicon_all).
+    """
+    if not os.path.exists(os.path.join(DIRECTORY, module + '.py')):
+        sys.stderr.write("Warning: lexicon/%s.py hasn't been fetched (see "
+                         "fetch_lexicon_all), so its words are left out.\n"
+                         % module)
+        return {}
+    return __import__(module, globals()).table
 
-# --- Grammar Rules ---
-rules = { 'N':'', 'A':'', 'P':'' }
+def build():
+    """Build the lexicon tables from the source modules."""
 
+    from auto_rules_N import table as auto_N
+    from auto_rules_A_country import table as auto_A_country
+    auto_A_ethnicity = optional_table('auto_rules_A_ethnicity')
+    auto_A_cuisine = optional_table('auto_rules_A_cuisine')
+    from auto_rules_predicate import table as auto_predicate
+    from auto_rules_property import table as auto_property
+    from auto_rules_type import table as auto_type
 
-# =============================================================================
-# Initialize the lexicon.
-# =============================================================================
+    from translate_metaschema import translate_metaschema
 
-# ===== Type Table =====
+    import add_N
+    import add_A
+    import add_A_relation
+    import add_predicate
+    import add_RelN
 
-type_table = auto_type
+    # --- Lexicon ---
+    (N_table, A_table, A_rel_table, pred_table, RelN_table, prop_table,
+     type_table) = ({}, {}, {}, {}, {}, {}, {})
 
-# ===== Property Table =====
+    # ===== Type Table =====
 
-prop_table = auto_property
+    type_table = auto_type
 
-# ===== Noun Table =====
+    # ===== Property Table =====
 
-N_table = auto_N 
-add_N.add_to(N_table)
+    prop_table = auto_property
 
-# ===== Adjective Table =====
+    # ===== Noun Table =====
 
-for auto_rules in (auto_A_country, ):  # More auto Adj rules can go here.
-    for adj in auto_rules:
-        if adj not in A_table: A_table[adj] = []
-        A_table[adj] += auto_rules[adj]
+    N_table = auto_N 
+    add_N.add_to(N_table)
 
-add_A.add_to(A_table)
+    # ===== Adjective Table =====
 
-# ===== Predicate Table =====
+    # Each sense of an adjective is a (type, mid) pair: the Freebase ID of the
+    # thing it denotes, and that thing's type.
+    for (auto_rules, type) in ((auto_A_country, '/location/country'),
+                               (auto_A_ethnicity, '/people/ethnicity'),
+                               (auto_A_cuisine, '/dining/cuisine')):
+        for adj in auto_rules:
+            if adj not in A_table: A_table[adj] = []
+            A_table[adj] += [(type, mid) for mid in sorted(auto_rules[adj])]
 
-# Copy auto-generated metaschema contents into pred_table, using
-# translate_metaschema to look up the lexicalizations.
-for predicate in auto_predicate:
-    senses = []
-    for sense in auto_predicate[predicate]:
-        senses.append(PredicateSense(sense[0], sense[1], sense[2]))
-    lexicalizations = translate_metaschema[predicate]
-    pred_table[predicate] = ConceptualPredicate(lexicalizations, senses)
-# Add additional handwritten predicates and senses.
-add_predicate.add_to(pred_table)
+    add_A.add_to(A_table)
+
+    # ===== Adjective Relation Table =====
+
+    add_A_relation.add_to(A_rel_table)
+
+    # ===== Predicate Table =====
+
+    # Copy auto-generated metaschema contents into pred_table, using
+    # translate_metaschema to look up the lexicalizations.
+    for predicate in auto_predicate:
+        senses = []
+        for sense in auto_predicate[predicate]:
+            senses.append(PredicateSense(sense[0], sense[1], sense[2]))
+        lexicalizations = translate_metaschema[predicate]
+        pred_table[predicate] = ConceptualPredicate(lexicalizations, senses)
+    # Add additional handwritten predicates and senses.
+    add_predicate.add_to(pred_table)
+
+    # ===== Relational Noun Table =====
+
+    add_RelN.add_to(RelN_table)
+
+    return (N_table, A_table, A_rel_table, pred_table, RelN_table, prop_table,
+            type_table)
 
 
 # =============================================================================
-# Initialize the grammar rules.
+# Save and load snapshots of the built lexicon.
 # =============================================================================
 
-for (cat, table) in (('N', N_table), ('A', A_table), ('P', pred_table)):
-    rules[cat] += '# ===== Auto-Generated %s Grammar Rules =====\n' % cat
-    rules[cat] += '%s ->' % cat
-    if cat in {'N', 'A'}:
-        rules[cat] += ' | '.join(["'" + x + "'" for x in sorted(table)])
-    if cat in {'P'}:
-        words = []
-        for pred in table:
-            words += [ lex[1] for lex in table[pred].lexicalizations ]
-        rules[cat] += ' | '.join(["'" + x + "'" for x in sorted(words)])
+def source_hash():
+    """Hash the snapshot version and the contents of every source file."""
+    digest = hashlib.sha1(str(SNAPSHOT_VERSION))
+    paths = set()
+    for pattern in SOURCE_PATTERNS:
+        paths |= set(glob.glob(os.path.join(DIRECTORY, pattern)))
+    for path in sorted(paths):
+        digest.update(os.path.basename(path))
+        with open(path, 'rb') as f: digest.update(f.read())
+    return digest.hexdigest()
+
+def load_snapshot(key):
+    """Return the tables saved in the snapshot file, or None if there's no
+    snapshot for this key.  The first line of the file is the key it was
+    built from; the rest is the pickled tables.
+    """
+    try:
+        with open(SNAPSHOT_PATH, 'rb') as f: data = f.read()
+    except IOError: return None
+    (header, _, body) = data.partition('\n')
+    if header != key: return None
+    try: return cPickle.loads(body)
+    except Exception: return None  # Corrupt snapshot, so just rebuild.
+
+def save_snapshot(key, tables):
+    """Write the tables to the snapshot file.  Writes to a temporary file and
+    renames it, so concurrent imports never read half a snapshot.  Failing to
+    save (e.g. in a read-only checkout) isn't fatal.
+    """
+    temp_path = '%s.%d.tmp' % (SNAPSHOT_PATH, os.getpid())
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(key + '\n')
+            cPickle.dump(tables, f, cPickle.HIGHEST_PROTOCOL)
+        os.rename(temp_path, SNAPSHOT_PATH)
+    except (IOError, OSError): pass
+
+snapshot_key = source_hash()
+tables = load_snapshot(snapshot_key)
+if tables is None:
+    tables = build()
+    save_snapshot(snapshot_key, tables)
+
+# --- Lexicon ---
+(N_table, A_table, A_rel_table, pred_table, RelN_table, prop_table,
+ type_table) = tables
+
+del tables
+
+# --- Indexes ---
+# Map each word that lexicalizes a predicate onto the senses of every
+# predicate it lexicalizes, in pred_table order.  This spares the interpreter
+# searching the whole pred_table for the meanings of a preposition.
+pred_index = {}
+for predicate in pred_table.values():
+    for word in set(lex[1] for lex in predicate.lexicalizations):
+        pred_index.setdefault(word, []).extend(predicate.senses)
@@ -1,4 +1,6 @@
-"""Define classes for use in a predicate table."""
+"""Define classes for use in a predicate table, and in the relational noun
+table, whose senses are predicates too.
+"""
 
 class PredicateSense:
     """A single interpretation of a conceptual predicate.  For example, one
@@ -12,12 +14,20 @@ class PredicateSense:
     path -- A list of Freebase property links that you have to traverse in
             order to get from subjects (of type S_type) to objects (of type
             O_type) on the relevant interpretation of the conceptual predicate.
+    via -- Extra properties of the things the path goes through, one list of
+            (property, name) pairs for each step after the first.  For
+            example, a mayor's path goes through a government position whose
+            basic title has the name 'Mayor'.
+
+    Once type_ids is loaded, S_types and O_types hold S_type and O_type as
+    type bitsets.
     """
 
-    def __init__(self, S_type, O_type, path):
+    def __init__(self, S_type, O_type, path, via=()):
         self.S_type = S_type
         self.O_type = O_type
         self.path = path
+        self.via = via
 
     def __repr__(self):
         return "PredicateSense(%s, %s, %s)" \
@@ -47,3 +57,41 @@ class ConceptualPredicate:
     def __repr__(self):
         return "ConceptualPredicate(%s, %s)" \
                % (self.lexicalizations, self.senses)
+
+def inverse_path(path):
+    """Return the path of properties leading back along a path, reversing each
+    property with (or un-reversing it from) a '!'.
+    """
+    return [property[1:] if property.startswith('!') else '!' + property
+            for property in reversed(path)]
+
+class RelNSense:
+    """A single interpretation of a relational noun, such as 'author' or
+    'mayor', which relates the things it describes to things of another type:
+    an author of a book, a mayor of a city.
+
+    reln_type -- The Freebase type of the things the noun describes.
+    O_type -- The Freebase type of the things they're related to.
+    path -- A list of Freebase property links to traverse to get from the
+            former to the latter.
+    via -- As for PredicateSense.
+
+    The relation is used in both directions, e.g. 'author of DP' and 'NBar
+    with (an) author DP', so each RelNSense also has its inverse, a
+    PredicateSense from O_type to reln_type.
+
+    Once type_ids is loaded, reln_types and O_types hold reln_type and O_type
+    as type bitsets.
+    """
+
+    def __init__(self, reln_type, O_type, path, via=()):
+        self.reln_type = reln_type
+        self.O_type = O_type
+        self.path = path
+        self.via = via
+        self.inverse = PredicateSense(O_type, reln_type, inverse_path(path),
+                                      list(reversed(via)))
+
+    def __repr__(self):
+        return "RelNSense(%s, %s, %s, %s)" % (repr(self.reln_type),
+                repr(self.O_type), repr(self.path), repr(self.via))
@@ -0,0 +1,137 @@
+"""MQL queries as immutable trees, for the semantics of interpretations.
+
+A Query is one MQL object, i.e. what goes between '[{' and '}]': a sequence
+of (key, value) properties, where a value is None (null), a string, or a
+nested Query.  Queries are never changed.  Adding properties makes a new
+Query that shares the old one's parts, so meanings built from the same child
+meanings share them rather than copying and re-parsing text.
+
+MQL doesn't allow the same key twice in one object, so a key can start with
+'ns:' (as in 'ns:type') to ask for a namespace prefix.  Prefixes are numbered
+('ns0:type', 'ns1:type', ...) only when a query is written out, so queries
+that are the same apart from their prefixes always come out the same.  For
+running, they're numbered in a canonical order of the properties (see
+ordered()), so that equal Queries make the same MQL (and so the same
+response cache key) whatever order their properties were added in.
+
+Queries compare (and hash) equal when they have the same properties in any
+order, with prefixes unnumbered, using a canonical form that each Query works
+out from its parts' as it's made.
+"""
+
+import re
+
+class Query:
+    """One MQL object.  Takes its properties as (key, value) pairs."""
+
+    def __init__(self, *properties):
+        self.properties = properties
+        self.canonical = canonical(properties)
+
+    def plus(self, *properties):
+        """Return this Query with more properties on the end."""
+        return made(self.properties + properties,
+                    self.canonical | canonical(properties))
+
+    def extend(self, other):
+        """Return this Query with another Query's properties on the end."""
+        return made(self.properties + other.properties,
+                    self.canonical | other.canonical)
+
+    def without(self, *properties):
+        """Return this Query without the given (key, value) properties."""
+        return Query(*[property for property in self.properties
+                       if property not in properties])
+
+    def renamed(self, old, new):
+        """Return this Query with the key old changed to new."""
+        return Query(*[(new if key == old else key, value)
+                       for (key, value) in self.properties])
+
+    def __eq__(self, other):
+        return isinstance(other, Query) and self.canonical == other.canonical
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.canonical)
+
+    def __str__(self):
+        """Write out as MQL text, the way findme -v shows queries."""
+        return text(self, prefixer())
+
+    def mql(self, limit=None):
+        """Return as a dict that json.dumps() writes as MQL, for running on
+        Freebase.  With limit, ask for at most that many of this and each
+        nested object.
+        """
+        prefix = prefixer()
+        def dict_of(query):
+            mql = dict((prefix(key), [dict_of(value)]
+                                     if isinstance(value, Query) else value)
+                       for (key, value) in ordered(query.properties))
+            if limit: mql['limit'] = limit
+            return mql
+        return dict_of(self)
+
+    def probe(self):
+        """Return as a dict like mql(), but for a cheap query that only finds
+        out whether there are any results: it keeps the constraints, but asks
+        for nothing but mids, and for at most one of each object.
+        """
+        prefix = prefixer()
+        def dict_of(query):
+            probe = {'mid': None, 'limit': 1}
+            for (key, value) in ordered(query.properties):
+                if isinstance(value, Query): value = [dict_of(value)]
+                elif value is None and key != 'mid': continue
+                probe[prefix(key)] = value
+            return probe
+        return dict_of(self)
+
+def canonical(properties):
+    """Return the canonical form of some properties: a frozenset of them, with
+    nested Queries replaced by their canonical forms.
+    """
+    return frozenset((key, value.canonical if isinstance(value, Query)
+                           else value)
+                     for (key, value) in properties)
+
+def made(properties, canonical):
+    """Return a Query of some properties whose canonical form is known."""
+    query = Query()
+    (query.properties, query.canonical) = (properties, canonical)
+    return query
+
+def ordered(properties):
+    """Return properties sorted into an order that's the same for any two
+    equal Queries.
+    """
+    return sorted(properties, key=lambda (key, value): (key, order(value)))
+
+def order(value):
+    """Return a key for sorting a value (or its canonical form) by content."""
+    if isinstance(value, Query): value = value.canonical
+    if isinstance(value, frozenset):
+        return sorted((key, order(value)) for (key, value) in value)
+    return value
+
+def prefixer():
+    """Return a function that numbers the 'ns:' keys it's given in turn."""
+    count = [0]
+    def prefix(key):
+        if not key.startswith('ns:'): return key
+        count[0] += 1
+        return 'ns%d:%s' % (count[0] - 1, key[3:])
+    return prefix
+
+def text(query, prefix):
+    properties = []
+    for (key, value) in query.properties:
+        key = prefix(key)
+        if value is None: value = 'null'
+        elif isinstance(value, Query): value = '[{ %s }]' % text(value, prefix)
+        else: value = "'%s'" % re.sub(r"(['\\])", r'\\\1', value)
+        properties.append("'%s': %s" % (key, value))
+    return ', '.join(properties)
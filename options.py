@@ -0,0 +1,39 @@
+"""Define the findme command line.  This is kept apart from search.py so that
+findme can read its arguments (and forward them to findme_daemon) without
+loading nltk, the lexicon or the grammar.
+"""
+
+import argparse
+
+DEFAULT_SOCKET = '.findme_socket'
+
+# Parse command line arguments.
+arg_parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Find things on Freebase.",
+        epilog="Examples:\n"
+            + "  ./findme cheeses from France\n"
+            + "  ./findme -z children of Obama  # -z for fuzzy names\n"
+            + "  ./findme help school           # 'help' looks for types\n"
+            + "  ./findme actor rel movie       # 'rel' asks for relations\n"
+            + "  ./findme -c cheeses from Spain # -c asks findme_daemon\n")
+arg_parser.add_argument('-v', '--verbose', action="store_true",
+        help="print verbose output (parses, queries, etc.)")
+arg_parser.add_argument('-z', '--fuzzy', action="store_true",
+        help="fuzzy name matching")
+arg_parser.add_argument('-g', '--full-grammar', action="store_true",
+        help="parse with the full lexicon grammar (slow, for debugging)")
+arg_parser.add_argument('-n', '--min',
+        help="minimum number of queries to run")
+arg_parser.add_argument('-x', '--max',
+        help="maximum number of queries to run")
+arg_parser.add_argument('-s', '--show', type=int, default=10,
+        help="number of queries to show (not necessarily run)")
+arg_parser.add_argument('-o', '--offline', action="store_true",
+        help="only use Freebase responses cached from earlier runs")
+arg_parser.add_argument('-c', '--client', action="store_true",
+        help="send the query to a running findme_daemon")
+arg_parser.add_argument('--socket', default=DEFAULT_SOCKET,
+        help="findme_daemon socket (default: %s)" % DEFAULT_SOCKET)
+arg_parser.add_argument('words', metavar='word', nargs='+',
+        help="a string of English words, e.g. female musicians")
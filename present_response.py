@@ -7,8 +7,14 @@ from lexicon.lexicon import prop_table
 
 seen_anywhere = []
 
-def present_response(response, query, max_per_level=10, indent=0, link="",
-                     shallow=False):
+# At most how many items of each list get printed, and how many times more to
+# ask Freebase for (see mql.Query.mql()), so that those printed are a random
+# selection.  With OVERSAMPLE 1, Freebase picks them.
+MAX_PER_LEVEL = 10
+OVERSAMPLE = 3
+
+def present_response(response, query, max_per_level=MAX_PER_LEVEL, indent=0,
+                     link="", shallow=False):
     """Takes a Freebase query response as JSON and prints out the relevant
     parts of the response.
 
@@ -63,7 +69,8 @@ def present_response(response, query, max_per_level=10, indent=0, link="",
                 if len(name_output) > 79:
                     name_output = name_output[:75] + ' ...\n'
                 if shallow: break  # Printed a name, skip further material.
-            elif not isinstance(response[element], basestring):
+            # (Only follow nested objects, not e.g. an echoed 'limit'.)
+            elif isinstance(response[element], (list, dict)):
                 m = re.search('/.*$', element)
                 prop = m.group(0)
                 next_link = prop_table[prop]  # Look up English name for prop.
@@ -0,0 +1,92 @@
+"""Run Freebase queries on a few threads at once, so that findme can send the
+queries it's likely to run next while it waits for (and prints) the results
+of the one before.
+
+Queries are started in order of priority (best fit first) as threads come
+free.  Queries that turn out not to be needed are cancelled: those that
+haven't started never are, and the responses of those already running are
+ignored.  How often requests go out is still limited, by freebase_query().
+"""
+
+import sys
+import Queue
+import itertools
+import threading
+
+class Pending:
+    """A query sent to a QueryPool, whose response comes later."""
+
+    def __init__(self, query):
+        self.query = query
+        self.done = threading.Event()
+        self.cancelled = False
+        self.response = None
+        self.error = None  # sys.exc_info() if running the query raised.
+
+    def result(self):
+        """Wait for and return the response, raising whatever running the
+        query raised.  Returns None for cancelled queries.
+        """
+        # (Waiting with a timeout lets KeyboardInterrupt through.)
+        while not self.done.wait(1): pass
+        if self.error: raise self.error[0], self.error[1], self.error[2]
+        return self.response
+
+# How long close() waits (in seconds) for each worker thread to finish.
+CLOSE_TIMEOUT = 1.0
+
+class QueryPool:
+    """Run queries with run(query) on up to a number of worker threads, which
+    are started as queries are submitted.
+    """
+
+    def __init__(self, run, workers=4):
+        self.run = run
+        self.workers = workers
+        self.queue = Queue.PriorityQueue()
+        self.count = itertools.count()  # Breaks ties in submission order.
+        self.threads = []
+
+    def submit(self, query, priority=0):
+        """Queue a query, to be started before those of higher priority, and
+        return its Pending.
+        """
+        pending = Pending(query)
+        self.queue.put((priority, next(self.count), pending))
+        if len(self.threads) < self.workers:
+            thread = threading.Thread(target=self.work)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+        return pending
+
+    def work(self):
+        while True:
+            (_, _, pending) = self.queue.get()
+            if pending is None: return  # Closed.
+            if pending.cancelled: continue
+            try: pending.response = self.run(pending.query)
+            except Exception: pending.error = sys.exc_info()
+            pending.done.set()
+
+    def cancel(self, pendings):
+        """Cancel queries that are no longer needed."""
+        for pending in pendings:
+            pending.cancelled = True
+            pending.done.set()
+
+    def close(self):
+        """Cancel whatever is queued and stop the worker threads once they
+        finish what they're running.
+        """
+        while True:
+            try: (_, _, pending) = self.queue.get_nowait()
+            except Queue.Empty: break
+            if pending: self.cancel([pending])
+        # A priority that sorts after every other, number or tuple.  (In
+        # Python 2, plain inf would sort before any tuple.)
+        last = (float('inf'),)
+        for thread in self.threads:
+            self.queue.put((last, next(self.count), None))
+        # (Threads still running a query are left to finish on their own.)
+        for thread in self.threads: thread.join(CLOSE_TIMEOUT)
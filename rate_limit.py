@@ -0,0 +1,102 @@
+"""A token bucket rate limiter, for keeping everything that queries Freebase
+(threads, coroutines, or several processes) within the quota together
+(10 queries per second, 100,000 per day) without leaving it underused.
+
+The bucket fills at rate tokens per second, up to burst tokens, and each
+request takes a token.  Requests that find the bucket empty wait their turn:
+the bucket's count goes negative, so later requests wait longer, in the order
+they came.
+
+Threads call acquire(), which waits.  Coroutines (or anything else that
+shouldn't block) call reserve(), which takes the token right away and
+returns how long to wait before using it.
+
+Given a path, the bucket is kept in that file (locked with flock()) rather
+than in memory, so that processes using the same file share it.
+
+Each limiter counts how long requests had to wait (see report()), for tuning
+rate and burst against the quota.
+"""
+
+import os
+import time
+import fcntl
+import threading
+
+class TokenBucket:
+    """A rate limiter.
+
+    rate -- Tokens added per second.
+    burst -- Most tokens the bucket holds, i.e. how many requests can go at
+            once after a quiet spell.
+    path -- A file to keep the bucket in, shared by processes, or None to
+            keep it in memory.
+    """
+
+    def __init__(self, rate=10, burst=10, path=None):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.path = path
+        self.lock = threading.Lock()
+        (self.tokens, self.stamp) = (self.burst, time.time())
+        # Statistics for report().
+        self.requests = 0
+        self.waits = 0
+        self.waited = 0.0
+        self.longest = 0.0
+        self.started = time.time()
+
+    def reserve(self, tokens=1):
+        """Take tokens from the bucket, and return how long (in seconds) to
+        wait before using them.
+        """
+        with self.lock:
+            if self.path: delay = self.reserve_shared(tokens)
+            else: delay = self.take(tokens)
+            self.requests += 1
+            if delay > 0:
+                self.waits += 1
+                self.waited += delay
+                self.longest = max(self.longest, delay)
+        return delay
+
+    def acquire(self, tokens=1):
+        """Wait until tokens can be used, and return how long that took."""
+        delay = self.reserve(tokens)
+        if delay > 0: time.sleep(delay)
+        return delay
+
+    def take(self, tokens):
+        """Refill the bucket for the time since it was last used, take
+        tokens, and return the wait before using them.
+        """
+        now = time.time()
+        self.tokens = min(self.burst,
+                          self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        self.tokens -= tokens
+        return max(0.0, -self.tokens / self.rate)
+
+    def reserve_shared(self, tokens):
+        """take() with the bucket kept in the file at path."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try: (self.tokens, self.stamp) = map(float,
+                                                 os.read(fd, 100).split())
+            except ValueError: (self.tokens, self.stamp) = (self.burst, 0)
+            delay = self.take(tokens)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, '%r %r\n' % (self.tokens, self.stamp))
+            return delay
+        finally: os.close(fd)  # (Releases the lock.)
+
+    def report(self):
+        """Return a summary of how requests have been limited."""
+        elapsed = max(time.time() - self.started, 1e-9)
+        return ('%d requests in %.1fs (%.2f/s, limit %.2f/s, burst %d); '
+                '%d waited, %.1fs in all, %.2fs at most'
+                % (self.requests, elapsed, self.requests / elapsed,
+                   self.rate, self.burst, self.waits, self.waited,
+                   self.longest))
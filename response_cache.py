@@ -0,0 +1,154 @@
+"""Keep Freebase responses in an SQLite database on disk, so that queries run
+again (in this findme run or a later one) don't go out to Freebase again.
+Queries made from common phrases like 'from Canada' come up over and over.
+
+Each response is stored zlib-compressed under a canonical form of its query
+and cursor.  Entries older than a time to live are treated as missing, and
+beyond a maximum number of entries, those least recently used are dropped.
+
+The database is opened on first use in each process (so findme_daemon
+workers don't share a connection across fork()), and may be used from
+several threads at once (see query_pool.py).  Since other processes may be
+writing to it, a database that stays locked is treated as a miss rather than
+waited on: going to Freebase is better than hanging.
+
+Reads don't write to the database.  When responses were last used is
+remembered in memory and written out in batches, with the next put() or
+every TOUCH_BATCH reads, so some of it is lost when a process exits, which
+only makes eviction a little less exact.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+
+# How long (in seconds) to wait for another process's lock on the database.
+LOCK_TIMEOUT = 1.0
+
+# How many reads to remember the use of before writing them out.
+TOUCH_BATCH = 100
+
+def query_key(query, cursor=''):
+    """Return the canonical form of a query and cursor used as a cache key:
+    the query as JSON with its keys sorted.
+    """
+    return '%s\n%s' % (json.dumps(query, sort_keys=True, separators=(',', ':')),
+                       cursor)
+
+class ResponseCache:
+    """A cache of Freebase responses.
+
+    path -- The SQLite database file, made if necessary.
+    ttl -- How long (in seconds) responses stay fresh.
+    max_entries -- How many responses to keep.
+    """
+
+    def __init__(self, path, ttl=7*24*60*60, max_entries=100000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.db = None
+        self.pid = None
+        self.inserts = 0  # Since the size was last checked.
+        self.touched = {}  # Last use of responses read since the last flush.
+
+    def connect(self):
+        """Return this process's connection to the database.  Raises
+        sqlite3.OperationalError if it can't be opened (e.g. in a directory
+        that isn't writable), in which case the next use tries again.
+        """
+        if self.pid != os.getpid():
+            # (Not the parent's connection after a fork(), even on failure.)
+            (self.db, self.pid) = (None, None)
+            db = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT,
+                                 check_same_thread=False)
+            db.execute('CREATE TABLE IF NOT EXISTS responses ('
+                       'key TEXT PRIMARY KEY, response BLOB, '
+                       'fetched REAL, used REAL)')
+            db.execute('CREATE INDEX IF NOT EXISTS responses_used '
+                       'ON responses (used)')
+            db.commit()
+            (self.db, self.pid) = (db, os.getpid())
+            self.touched = {}
+        return self.db
+
+    def get(self, query, cursor='', stale=False):
+        """Return the cached response to a query (with a cursor), or None.
+        With stale set, return responses past their time to live too.
+        """
+        key = query_key(query, cursor)
+        now = time.time()
+        with self.lock:
+            try:
+                db = self.connect()
+                row = db.execute('SELECT response, fetched FROM responses '
+                                 'WHERE key = ?', (key,)).fetchone()
+                if row is None: return None
+                (response, fetched) = row
+                if not stale and now - fetched > self.ttl: return None
+                self.touched[key] = now
+                if len(self.touched) >= TOUCH_BATCH:
+                    self.flush(db)
+                    db.commit()
+            except sqlite3.OperationalError:  # E.g. the database is locked.
+                self.rollback()
+                return None
+        return json.loads(zlib.decompress(str(response)))
+
+    def put(self, query, cursor, response):
+        """Cache the response to a query (with a cursor)."""
+        key = query_key(query, cursor)
+        data = sqlite3.Binary(zlib.compress(json.dumps(response)))
+        now = time.time()
+        with self.lock:
+            try:
+                db = self.connect()
+                db.execute('INSERT OR REPLACE INTO responses '
+                           'VALUES (?, ?, ?, ?)', (key, data, now, now))
+                self.touched.pop(key, None)
+                self.flush(db)
+                self.inserts += 1
+                # Check the size now and then, rather than on every insert.
+                if self.inserts >= max(self.max_entries // 100, 1):
+                    self.evict(db)
+                db.commit()
+            except sqlite3.OperationalError:  # Not cached this time, then.
+                self.rollback()
+
+    def flush(self, db):
+        """Write out when the responses read since the last flush were
+        used.
+        """
+        if self.touched:
+            db.executemany('UPDATE responses SET used = ? WHERE key = ?',
+                           [(used, key) for (key, used)
+                            in self.touched.items()])
+            self.touched = {}
+
+    def rollback(self):
+        if self.db is None: return  # Never connected.
+        try: self.db.rollback()
+        except sqlite3.Error: pass
+
+    def evict(self, db):
+        """Drop the least recently used responses beyond max_entries."""
+        self.inserts = 0
+        (count,) = db.execute('SELECT COUNT(*) FROM responses').fetchone()
+        if count > self.max_entries:
+            db.execute('DELETE FROM responses WHERE key IN (SELECT key FROM '
+                       'responses ORDER BY used LIMIT ?)',
+                       (count - self.max_entries,))
+
+    def clear(self):
+        """Drop every cached response."""
+        with self.lock:
+            try:
+                db = self.connect()
+                db.execute('DELETE FROM responses')
+                db.commit()
+            except sqlite3.OperationalError:  # Nothing to clear, then.
+                self.rollback()
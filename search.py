@@ -0,0 +1,363 @@
+"""Run findme queries.  This is everything findme does after reading its
+command line (see findme for the steps), kept in a module so that findme_daemon
+can load the parser, lexicon and grammar once and answer many queries.
+"""
+
+from __future__ import print_function
+from __future__ import division
+
+import sys
+import re
+import nltk
+import inflect
+
+import freebase_query as freebase
+from freebase_query import freebase_query, freebase_queries
+from query_pool import QueryPool
+import present_response
+import interpret
+import grammar
+import lattice
+import forest
+import type_ids
+from lexicon import lexicon
+from compatibility import matrix as compatibility
+
+DEFAULT_MIN = 3
+DEFAULT_MAX = 50
+
+# How many queries to send to Freebase together in one batch request, and how
+# many batches can be running at once: the batch with the query whose results
+# are being waited for, and the next.
+BATCH_SIZE = 4
+BATCHES = 2
+
+def query_limits(args):
+    """Return (min_queries, max_queries, show_queries) for parsed command
+    line arguments, filling in defaults for whatever wasn't given.
+    """
+    if (not args.min and not args.max):
+        min_queries = DEFAULT_MIN
+        max_queries = DEFAULT_MAX
+    elif (args.min and args.max):
+        min_queries = int(args.min)
+        max_queries = int(args.max)
+    # Set max to default, but not less than min.
+    elif (args.min and not args.max):
+        min_queries = int(args.min)
+        max_queries = max(DEFAULT_MAX, min_queries)
+    # Set min to default, but not more than max.
+    elif (args.max and not args.min):
+        max_queries = int(args.max)
+        min_queries = min(DEFAULT_MIN, max_queries)
+    show_queries = max(args.show, min_queries)
+    return (min_queries, max_queries, show_queries)
+
+def print_help(query, verbose=False):
+    """For a 'help word' query print known types that can be referred to by a
+    name containing that word.
+    """
+    infl = inflect.engine()
+    name_matches = set()
+    comp_matches = set()
+    query = re.sub("help\s*", '', query)
+    try:
+        query_sing = infl.singular_noun(query)
+        if not query_sing: query_sing = query
+    except: query_sing = query
+    for name in lexicon.N_table:
+        if query_sing in name: name_matches |= {name}
+    # For exact match, show highly compatible types as well.
+    if query_sing in lexicon.N_table:
+        for query_type in lexicon.N_table[query_sing]:
+            if query_type not in compatibility:
+                if verbose:
+                    sys.stderr.write("Warning: '%s'" % query_type +
+                                     " not in compatibility matrix.\n")
+                continue
+            count = compatibility.count(query_type, query_type)
+            for (comp_type, comp_count) in compatibility.row(query_type):
+                if comp_count > count / 20:
+                    comp_matches |= {lexicon.type_table[comp_type]}
+        comp_matches -= name_matches
+        comp_matches -= {'topic'}
+
+    # First print matching names, then print compatible names.
+    first = 0
+    for matches in (name_matches, comp_matches):
+
+        # Find the shortest matching name that ends in the same word.
+        shortest_with_ending = {}
+        for name in matches:
+            words = name.split()
+            length = len(words)
+            last = words[-1]
+            if last not in shortest_with_ending:
+                shortest_with_ending[last] = length
+            else:
+                shortest_with_ending[last] = \
+                        min(shortest_with_ending[last], length)
+
+        # Sort by shortest with ending > last word > words count > alphabetical
+        for name in sorted(matches,
+                key = lambda x: (shortest_with_ending[x.split()[-1]],
+                                 x.split()[-1], len(x.split()), x)):
+            try:
+                singular = infl.singular_noun(name)
+                if singular and singular in matches:
+                    continue # Skip plurals whose singulars we've seen.
+            except: pass  # If infl.singular_noun breaks, count it as singular.
+            if first == 1: print('Similar: ', end='')
+            print(name)
+
+        first += 1
+
+def find(args):
+    """Run the query given by parsed command line arguments (see
+    options.arg_parser), printing results to sys.stdout.
+    """
+
+    (min_queries, max_queries, show_queries) = query_limits(args)
+    verbose = args.verbose or (max_queries == 0)
+    interpret.FUZZY_NAMES = args.fuzzy
+    freebase.OFFLINE = args.offline
+
+    # Start afresh if an earlier query ran in this process (in a daemon).
+    interpret.forget()
+    del present_response.seen_anywhere[:]
+
+    query = ' '.join(args.words)
+    tokens = query.split()
+
+    if 'help' in query.lower():
+        print_help(query, verbose)
+        return
+
+    # Find every lexicon (multi)word in the query, including overlapping ones
+    # like 'musical recording' and 'recording artist'.  The parser decides
+    # between them.
+    edges = lattice.lattice(tokens)
+    known = [False] * len(tokens)  # Whether each token is in some word.
+    named = [True] * len(tokens)   # Whether each token can be in a name.
+    for (start, end, word) in edges:
+        for index in range(start, end):
+            known[index] = True
+            # While reading a name, treat 'of' and 'the' as part of the name.
+            if word not in {'of', 'the'}: named[index] = False
+
+    # Build the grammar.  By default, only lexicon words that occur in the
+    # query get lexical rules, which makes the grammar (and parser) tiny.
+    if args.full_grammar: grammar_rules = grammar.rules
+    else: grammar_rules = grammar.rules_for(word for (_, _, word) in edges)
+
+    # Add unrecognized (multi-)words to the grammar as DPs.  Changes longest
+    # consecutive sequence of unrecognized words possible.  Print a warning
+    # for lowercase names.
+    words = []
+    lower_names = []
+    index = 0
+    while index < len(tokens):
+        if known[index]:
+            words.append(tokens[index])
+            index += 1
+            continue
+        # Merge this and all immediately following unrecognized words.
+        end = index + 1
+        while end < len(tokens) and named[end]: end += 1
+        name = ' '.join(tokens[index:end])
+        words.append(name)
+        index = end
+        # If any word in the name is lower case, add it to warning list.
+        # (Except for common lower case name components.)
+        for name_word in name.split():
+            if name_word.islower() and name_word not in {'of', 'the'}:
+                lower_names.append(name)
+                break
+        # (Quote names like O'Brien with double quotes.)
+        quote = '"' if "'" in name else "'"
+        grammar_rules += 'DP -> %s%s%s\n' % (quote, name, quote)
+    if lower_names:
+        name_str = 'names'
+        if len(lower_names) == 1: name_str = 'a name'
+        print("\nTreating %s as %s." %
+                (', '.join(["'%s'" % x for x in lower_names]), name_str))
+
+    cfg = nltk.parse_cfg(grammar_rules)
+    parser = nltk.ChartParser(cfg)
+    chart = parser.chart_parse(words)
+
+    # Pack the parses into a forest, so parts shared by several parses are
+    # only interpreted once.
+    parses = forest.pack(chart, cfg.start())
+
+    if not parses:
+        print("\nFailed to parse!\n")
+        return
+
+    if verbose:
+        for tree in chart.parses(cfg.start()):
+            print('')
+            print(grammar.join_multiwords(tree))
+
+    pool = QueryPool(freebase_queries, BATCHES)
+    try: seen_meanings = run_passes(parses, pool, verbose, min_queries,
+                                    max_queries, show_queries)
+    finally: pool.close()
+
+    if not seen_meanings:
+        if 'rel' not in query.lower():
+            if verbose: print('Meaningless!\n')
+            else: print('\nMeaningless!')
+
+    if not verbose: print('')
+
+def run_passes(parses, pool, verbose, min_queries, max_queries,
+               show_queries):
+    """Interpret the parses and run the interpretations' queries on Freebase
+    (using pool), printing the results.  Returns the set of meanings seen.
+    """
+
+    seen_meanings = set()
+    query_count = 0
+    ran_count = 0
+    found_results = 0
+    separator = ''
+
+    # Do successively deeper passes finding possible interpretations of the
+    # parses.  On each pass, query the new interpretations out to Freebase.
+    # Stop when we reach our goal, as specified by the min, max and show
+    # parameters.  The 'accuracy' index is (roughly) how many meaning senses
+    # to entertain for a given phrase unit.
+    for accuracy in map(lambda x: 3*10**x, range(10)):
+
+        done = False
+        new_interps = []
+        interpret.ACCURACY = accuracy
+        interpret.MADE_ACCURACY_CUTS = False
+
+        if verbose: print("\nSetting accuracy: %d\n" % accuracy)
+
+        # Get interpretations of the parses at this level of accuracy.
+        # Find which of these are new interpretations.  Mark them as seen.
+        for interp in interpret.DP(parses):
+            # (Semantics compare equal regardless of property order and
+            # namespace prefix numbers.)
+            if interp.sem not in seen_meanings:
+                seen_meanings |= {interp.sem}
+                new_interps.append(interp)
+
+        print_output = []
+        new_interps.sort(key=lambda x: x.fit, reverse=True)  # Sort by fit.
+        new_interps = new_interps[:max(max_queries, show_queries)]
+        # Queries sent ahead, as (batch, index in batch) by position in
+        # new_interps, and which batches of BATCH_SIZE positions were sent.
+        pending = {}
+        batches = set()
+        if new_interps:
+            for (position, result) in enumerate(new_interps):
+
+                # Send the batch of queries that might be run next, and the
+                # batch after, best first, while we wait for this one.
+                # Whether they're actually run is decided when we get to them.
+                # (Each interpretation counts as a query, run or not.)  Most
+                # queries get no results, so what's sent is just a probe for
+                # whether there are any (see mql.Query.probe()), and the full
+                # query is only run for those that hit.
+                for batch in (position // BATCH_SIZE,
+                              position // BATCH_SIZE + 1):
+                    if batch in batches: continue
+                    batches.add(batch)
+                    ahead = []
+                    for later in range(max(position, batch * BATCH_SIZE),
+                                       min((batch + 1) * BATCH_SIZE,
+                                           len(new_interps))):
+                        count = query_count + later - position
+                        if count < max_queries and \
+                                (found_results == 0 or count < min_queries):
+                            ahead.append(later)
+                    if not ahead: continue
+                    sent = pool.submit(
+                            # (Each a list, like the queries run directly.)
+                            [[new_interps[later].sem.probe()]
+                             for later in ahead],
+                            (-new_interps[ahead[0]].fit, batch))
+                    for (index, later) in enumerate(ahead):
+                        pending[later] = (sent, index)
+
+                if verbose:
+                    print('=================================================='
+                          '====')
+                    print('Types: %s'
+                          % ', '.join(type_ids.type_names(result.types)))
+                    print('Query: %s' % result.sem)
+                    fit = result.fit
+                    if fit > 0.0001: print('Fit: %.4f' % fit)
+                    else: print('Fit: %.2E' % fit)
+
+                # Fetch first min_queries always.  If still no hits, fetch
+                # more until first hit.  Give up at max_queries.
+                if (query_count < max_queries and found_results == 0) \
+                        or (query_count < min_queries):
+
+                    # Run query on Freebase.
+
+                    ran_count += 1
+                    # (Don't fetch more than could be printed.)
+                    query = [result.sem.mql(present_response.MAX_PER_LEVEL *
+                                            present_response.OVERSAMPLE)]
+
+                    # Make two attempts at the Freebase query.  Usually a
+                    # second fail indicates an impossible query.
+                    for attempt in range(2):
+                        if attempt == 0 and position in pending:
+                            (sent, index) = pending.pop(position)
+                            response = sent.result()[index]
+                            # Run the full query if the probe hit (or failed).
+                            if response: response = freebase_query(query)
+                        else: response = freebase_query(query)
+                        if 'error' in response:
+                            print('Error: %s'
+                                  % (response['error']['message']))
+                        else:
+                            if response: found_results += 1
+                            output = present_response.present_response(
+                                    response, query)
+                            if verbose:
+                                print('--- Results ---\n' + output)
+                            elif output not in print_output:
+                                print_output.append(output)
+                                if output:
+                                    print(separator)
+                                    if not separator:
+                                        separator = '-' * 50
+                                print(output, end='')
+                            break
+
+                # If we're done running queries on Freebase and not interested
+                # in actually looking at the queries, then stop generating
+                # queries.
+                elif not verbose:
+                    done = True
+                    break
+
+                query_count += 1
+                if found_results and query_count >= show_queries:
+                    if verbose:
+                        print("\nShowed %d queries and ran %d, out of which %d"
+                              % (show_queries, ran_count, found_results) +
+                              " got hits.\n")
+                    done = True
+                    break
+
+        # Don't wait for queries we've decided not to run.
+        pool.cancel(set(sent for (sent, _) in pending.values()))
+
+        if done: break
+
+        # If turning up accuracy won't help, don't.
+        if not interpret.MADE_ACCURACY_CUTS:
+            if verbose: print("\nAccuracy %d covered all possible "
+                              % accuracy + "interpretations.\n")
+            break
+
+    return seen_meanings
@@ -0,0 +1,216 @@
+"""Answer findme queries from a long-running process over a Unix socket, so
+that nltk, the lexicon, the grammar and the compatibility matrix are loaded
+once rather than on every run.
+
+The protocol is minimal: the client sends its command line arguments as one
+line of JSON, and the server streams back the query's output and then closes
+the connection.
+
+The server loads search.py and then forks worker processes, each of which
+accepts and answers one query at a time.  The workers share the parent's
+memory (including the memory-mapped compatibility matrix) copy-on-write.
+
+Signals to the server process:
+
+    SIGHUP -- Graceful reload.  Workers finish their current query, then the
+            server re-executes itself (picking up any code or lexicon changes)
+            while keeping the socket open, so waiting clients are answered by
+            the new workers.
+    SIGTERM, SIGINT -- Shut down once workers finish their current query.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import json
+import time
+import errno
+import codecs
+import signal
+import socket
+import traceback
+
+# Environment variable used to hand the listening socket to a reloaded server.
+LISTEN_FD_VARIABLE = 'FINDME_SERVER_FD'
+
+# How often (in seconds) idle workers check whether they've been told to stop.
+ACCEPT_TIMEOUT = 1.0
+
+def connect(socket_path):
+    """Connect to a server.  Raises socket.error if none is listening."""
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.connect(socket_path)
+    return connection
+
+def forward(connection, argv, out=sys.stdout):
+    """Send command line arguments to a server and copy the output to out as
+    it arrives.
+    """
+    try:
+        connection.sendall(json.dumps(argv) + '\n')
+        while True:
+            data = connection.recv(4096)
+            if not data: break
+            out.write(data)
+            out.flush()
+    finally: connection.close()
+
+class Server:
+    """A preforking findme server.
+
+    socket_path -- Where to listen.
+    workers -- How many queries to answer at once (one per worker process).
+    cache_stats -- Whether to log compatibility cache statistics after each
+            query.
+    """
+
+    def __init__(self, socket_path, workers=4, cache_stats=False):
+        self.socket_path = socket_path
+        self.num_workers = workers
+        self.cache_stats = cache_stats
+        self.workers = set()
+        self.stopping = False
+        self.reloading = False
+
+    def log(self, message):
+        sys.stderr.write('[%s %d] %s\n'
+                         % (time.strftime('%H:%M:%S'), os.getpid(), message))
+
+    def listen(self):
+        """Open the listening socket, or take over the one left by the server
+        we were reloaded from.
+        """
+        if LISTEN_FD_VARIABLE in os.environ:
+            fd = int(os.environ.pop(LISTEN_FD_VARIABLE))
+            self.listener = socket.fromfd(fd, socket.AF_UNIX,
+                                          socket.SOCK_STREAM)
+            os.close(fd)  # fromfd() made a copy.
+        else:
+            if os.path.exists(self.socket_path): os.unlink(self.socket_path)
+            self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.listener.bind(self.socket_path)
+            self.listener.listen(64)
+
+    def serve(self):
+        """Load everything, start the workers and supervise them until told
+        to stop or reload.
+        """
+        self.listen()
+
+        # Load nltk, the lexicon, grammar, etc. once, before forking.
+        import search
+        self.log('Listening on %s with %d workers'
+                 % (self.socket_path, self.num_workers))
+
+        signal.signal(signal.SIGHUP, self.handle_reload)
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+
+        while len(self.workers) < self.num_workers: self.start_worker()
+
+        while not (self.stopping or self.reloading):
+            try: (pid, status) = os.wait()
+            except OSError as e:
+                if e.errno == errno.EINTR: continue  # Got a signal.
+                raise
+            # Replace workers that die unexpectedly.
+            if pid in self.workers:
+                self.workers.remove(pid)
+                self.log('Worker %d exited (status %d), restarting'
+                         % (pid, status))
+                self.start_worker()
+
+        # Let workers finish whatever query they're answering.
+        for pid in self.workers: os.kill(pid, signal.SIGTERM)
+        while self.workers:
+            try: self.workers.discard(os.wait()[0])
+            except OSError as e:
+                if e.errno == errno.EINTR: continue
+                if e.errno == errno.ECHILD: break
+                raise
+
+        if self.reloading:
+            self.log('Reloading')
+            os.environ[LISTEN_FD_VARIABLE] = str(self.listener.fileno())
+            # Scripts chdir to their own directory, which is sys.path[0].
+            script = os.path.join(sys.path[0], os.path.basename(sys.argv[0]))
+            os.execv(sys.executable, [sys.executable, script] + sys.argv[1:])
+
+        self.log('Stopping')
+        self.listener.close()
+        os.unlink(self.socket_path)
+
+    def handle_reload(self, signum, frame):
+        self.reloading = True
+
+    def handle_stop(self, signum, frame):
+        self.stopping = True
+
+    def start_worker(self):
+        pid = os.fork()
+        if pid:
+            self.workers.add(pid)
+            return
+        # In the worker.
+        try: self.work()
+        finally: os._exit(0)
+
+    def work(self):
+        """Accept and answer queries until told to stop."""
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        # Don't let a stop request interrupt a query in progress.
+        signal.siginterrupt(signal.SIGTERM, False)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        self.listener.settimeout(ACCEPT_TIMEOUT)
+
+        while not self.stopping:
+            try: (connection, address) = self.listener.accept()
+            except socket.timeout: continue
+            except socket.error as e:
+                if e.errno in (errno.EINTR, errno.EAGAIN): continue
+                raise
+            connection.settimeout(None)
+            self.answer(connection)
+
+    def answer(self, connection):
+        """Run the query sent on a connection, with output (and error
+        messages, e.g. argparse's usage) to the connection.
+        """
+        import options
+        import search  # Already loaded by serve().
+
+        start = time.time()
+        request = connection.makefile('rb')
+        response = connection.makefile('wb', 0)
+        (stdout, stderr) = (sys.stdout, sys.stderr)
+        sys.stdout = sys.stderr = codecs.getwriter('utf-8')(response)
+        argv = None
+        try:
+            argv = json.loads(request.readline())
+            search.find(options.arg_parser.parse_args(argv))
+        except SystemExit: pass  # Bad arguments; argparse has complained.
+        except socket.error: pass  # Client went away.
+        except Exception:
+            traceback.print_exc(file=sys.stdout)
+            traceback.print_exc(file=stderr)
+        finally:
+            (sys.stdout, sys.stderr) = (stdout, stderr)
+            try:
+                response.close()
+                request.close()
+                connection.close()
+            except socket.error: pass  # Client went away.
+        self.log('%.2fs %s' % (time.time() - start, argv))
+        if self.cache_stats: self.log_cache_stats()
+
+    def log_cache_stats(self):
+        """Log how well this worker's compatibility caches are doing."""
+        import compatibility
+        for (name, info) in sorted(compatibility.cache_info().items()):
+            lookups = info.hits + info.misses
+            self.log('%s cache: %d/%d entries, %.1f%% of %d lookups hit'
+                     % (name, info.currsize, info.maxsize,
+                        100.0 * info.hits / max(lookups, 1), lookups))
@@ -0,0 +1,104 @@
+"""Tests for http_pool.py, against a local server.  Run with
+python -m unittest test_http_pool
+"""
+
+import gzip
+import socket
+import httplib
+import StringIO
+import unittest
+import threading
+import SocketServer
+import BaseHTTPServer
+
+from http_pool import ConnectionPool
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answers with the path and how many connections the server has seen,
+    gzipped if asked.  Requests for /drop are answered as if the connection
+    stays open, but then it's closed.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def do_GET(self, body=''):
+        content = '%s %d' % (self.path, self.server.connections)
+        headers = {'Content-Type': 'text/plain'}
+        if 'gzip' in self.headers.get('accept-encoding', ''):
+            data = StringIO.StringIO()
+            with gzip.GzipFile(fileobj=data, mode='wb') as f: f.write(content)
+            content = data.getvalue()
+            headers['Content-Encoding'] = 'gzip'
+        self.server.encodings.append(headers.get('Content-Encoding'))
+        self.send_response(200)
+        for (name, value) in headers.items(): self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+        if self.path == '/drop': self.close_connection = 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['content-length']))
+        self.server.posts += 1
+        self.do_GET()
+
+    def log_message(self, *args): pass
+
+class Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    connections = 0
+    posts = 0
+
+    def __init__(self, *args):
+        BaseHTTPServer.HTTPServer.__init__(self, *args)
+        self.encodings = []  # Content-Encoding of each response sent.
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.pool = ConnectionPool('http://127.0.0.1:%d/mqlread'
+                                   % self.server.server_address[1],
+                                   timeout=5)
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reuse(self):
+        self.assertEqual(self.pool.get('a=1'), '/mqlread?a=1 1')
+        self.assertEqual(self.pool.get('a=2'), '/mqlread?a=2 1')
+        self.assertEqual(self.server.connections, 1)
+
+    def test_gzip(self):
+        (content_type, body) = self.pool.send('GET', '/x')
+        self.assertEqual((content_type, body), ('text/plain', '/x 1'))
+        self.assertEqual(self.server.encodings, ['gzip'])
+
+    def test_retry(self):
+        # The connection the server dropped is retried once, on a new one.
+        self.pool.send('GET', '/drop')
+        self.assertEqual(self.pool.send('GET', '/x')[1], '/x 2')
+        self.assertEqual(self.server.connections, 2)
+
+    def test_no_retry_post(self):
+        self.pool.send('GET', '/drop')
+        self.assertRaises((httplib.HTTPException, socket.error),
+                          self.pool.send, 'POST', '/x', 'body')
+        self.assertEqual(self.server.posts, 0)
+        # Unless asked for.
+        self.pool.send('GET', '/drop')
+        self.assertEqual(self.pool.send('POST', '/x', 'body', retry=True)[1],
+                         '/x 3')
+        self.assertEqual(self.server.posts, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+"""Intern Freebase type names as small integer IDs, so that a set of types can
+be a bitset: an int with bit i set for each type with ID i.  The interpreter
+unions, hashes and compares sets of types constantly, and on bitsets these are
+all integer operations.  Names are only needed again for output (findme -v).
+
+IDs are the compatibility matrix's own type IDs (see compatibility_file.py),
+so compatibility lookups need no name lookups.  Types missing from the matrix
+get the IDs after those.
+"""
+
+from compatibility import matrix, ids_in
+from lexicon import lexicon
+
+names = list(matrix.type_names())
+ids = dict((name, id) for (id, name) in enumerate(names))
+
+def type_id(name):
+    """Return the ID of a type name, assigning a new one if necessary."""
+    id = ids.get(name)
+    if id is None:
+        id = ids[name] = len(names)
+        names.append(name)
+    return id
+
+def type_set(*type_names):
+    """Return the bitset of the given type names."""
+    bits = 0
+    for name in type_names: bits |= 1 << type_id(name)
+    return bits
+
+def type_names(bits):
+    """Return the names of the types in a bitset, in order of ID."""
+    return [names[id] for id in ids_in(bits)]
+
+# Give every type the lexicon knows an ID now, rather than during a query, and
+# give each predicate sense (and relational noun sense, and its inverse) its
+# types as bitsets.
+for name in sorted(lexicon.type_table): type_id(name)
+for predicate in lexicon.pred_table.values():
+    for sense in predicate.senses:
+        sense.S_types = type_set(sense.S_type)
+        sense.O_types = type_set(sense.O_type)
+for senses in lexicon.RelN_table.values():
+    for sense in senses:
+        sense.reln_types = type_set(sense.reln_type)
+        sense.O_types = type_set(sense.O_type)
+        sense.inverse.S_types = type_set(sense.inverse.S_type)
+        sense.inverse.O_types = type_set(sense.inverse.O_type)